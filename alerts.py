@@ -0,0 +1,481 @@
+import os
+import json
+import math
+import fcntl
+import heapq
+import bisect
+import threading
+from contextlib import contextmanager
+
+ALERTS_FILE = os.getenv("ALERTS_FILE", "alerts.json")
+ALERT_HYSTERESIS = float(os.getenv("ALERT_HYSTERESIS", "0.001"))
+ALERT_COOLDOWN = float(os.getenv("ALERT_COOLDOWN", "1800"))
+ALERT_JOURNAL_SLACK = int(os.getenv("ALERT_JOURNAL_SLACK", "4096"))
+KINDS = ("above", "below", "change")
+FIRE = 0
+REARM = 1
+BOOK_BUCKET = 512
+
+
+class AlertRule:
+    __slots__ = ("id", "chat_id", "symbol", "kind", "value", "hysteresis", "cooldown",
+                 "anchor", "armed", "last_fired", "generation")
+
+    def __init__(self, id, chat_id, symbol, kind, value, hysteresis, cooldown,
+                 anchor=None, armed=True, last_fired=None):
+        self.id = id
+        self.chat_id = str(chat_id)
+        self.symbol = symbol
+        self.kind = kind
+        self.value = value
+        self.hysteresis = hysteresis
+        self.cooldown = cooldown
+        self.anchor = anchor
+        self.armed = armed
+        self.last_fired = last_fired
+        self.generation = 0
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__ if name != "generation"}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+    def describe(self):
+        if self.kind == "change":
+            return f"#{self.id} {self.symbol} %{self.value:g} değişim"
+        return f"#{self.id} {self.symbol} {self.value:.2f} {'üzeri' if self.kind == 'above' else 'altı'}"
+
+    def message(self, price):
+        if self.kind == "above":
+            return f"🔔 {self.symbol} {price:.2f} USD ile {self.value:.2f} seviyesinin üzerine çıktı"
+        if self.kind == "below":
+            return f"🔔 {self.symbol} {price:.2f} USD ile {self.value:.2f} seviyesinin altına indi"
+        change = (price - self.anchor) / self.anchor * 100
+        return f"🔔 {self.symbol} %{change:+.2f} değişti: {self.anchor:.2f} → {price:.2f} USD"
+
+
+class ThresholdBook:
+    # Eşikler artan sırada, her biri en fazla BOOK_BUCKET*2 elemanlı kovalara
+    # bölünmüş olarak tutulur; ekleme tek kova içinde kalır. Yükselen kitapta
+    # fiyatın altında kalan (önek), düşen kitapta fiyatın üstünde kalan (sonek)
+    # eşikler tetiklenmiştir ve ikili aramayla bulunur.
+    def __init__(self, rising):
+        self.rising = rising
+        self._levels = []
+        self._entries = []
+        self._maxes = []
+        self._len = 0
+
+    def add(self, level, entry):
+        self._len += 1
+        if not self._maxes:
+            self._levels.append([level])
+            self._entries.append([entry])
+            self._maxes.append(level)
+            return
+        b = min(bisect.bisect_left(self._maxes, level), len(self._maxes) - 1)
+        levels, entries = self._levels[b], self._entries[b]
+        i = bisect.bisect_right(levels, level)
+        levels.insert(i, level)
+        entries.insert(i, entry)
+        self._maxes[b] = levels[-1]
+        if len(levels) > 2 * BOOK_BUCKET:
+            self._levels[b + 1:b + 1] = [levels[BOOK_BUCKET:]]
+            self._entries[b + 1:b + 1] = [entries[BOOK_BUCKET:]]
+            del levels[BOOK_BUCKET:], entries[BOOK_BUCKET:]
+            self._maxes[b:b + 1] = [levels[-1], self._levels[b + 1][-1]]
+
+    def pop_triggered(self, price):
+        triggered = []
+        if self.rising:
+            while self._maxes and self._maxes[0] <= price:
+                self._maxes.pop(0)
+                self._levels.pop(0)
+                triggered.extend(self._entries.pop(0))
+            if self._levels:
+                i = bisect.bisect_right(self._levels[0], price)
+                triggered.extend(self._entries[0][:i])
+                del self._levels[0][:i], self._entries[0][:i]
+        else:
+            while self._levels and self._levels[-1][0] >= price:
+                self._maxes.pop()
+                self._levels.pop()
+                triggered.extend(self._entries.pop())
+            if self._levels:
+                i = bisect.bisect_left(self._levels[-1], price)
+                triggered.extend(self._entries[-1][i:])
+                del self._levels[-1][i:], self._entries[-1][i:]
+                self._maxes[-1] = self._levels[-1][-1]
+        self._len -= len(triggered)
+        return triggered
+
+    def compact(self, valid):
+        items = [(level, entry) for levels, entries in zip(self._levels, self._entries)
+                 for level, entry in zip(levels, entries) if valid(entry)]
+        self._levels = [[level for level, _ in items[k:k + BOOK_BUCKET]] for k in range(0, len(items), BOOK_BUCKET)]
+        self._entries = [[entry for _, entry in items[k:k + BOOK_BUCKET]] for k in range(0, len(items), BOOK_BUCKET)]
+        self._maxes = [levels[-1] for levels in self._levels]
+        self._len = len(items)
+
+    def __len__(self):
+        return self._len
+
+
+class AlertEngine:
+    # Seviye kuralları tetiklenince silahsızlanır ve fiyat histerezis bandının
+    # diğer tarafına geçene kadar yeniden kurulmaz. Yüzde kuralları tetiklendiği
+    # fiyata yeniden çapalanır. Bekleme süresindeki kurallar zaman yığınında bekler.
+    # Silinen ya da güncellenen kuralların eski eşikleri nesil sayacıyla tembelce atlanır.
+    # Dosya birden çok süreçte paylaşılır (API'yi sunan izleyiciler kural ekler, lider
+    # değerlendirir): her işlem önce başka süreçlerin yazdığı değişiklikleri yükler.
+    # Değişen kurallar anlık görüntünün yanındaki günlüğe satır satır eklenir; günlük
+    # kural sayısını aşınca anlık görüntü arka planda yeniden yazılır (tick başına O(k) yazım).
+    def __init__(self, path=ALERTS_FILE, hysteresis=ALERT_HYSTERESIS, cooldown=ALERT_COOLDOWN):
+        self.path = path
+        self.hysteresis = hysteresis
+        self.cooldown = cooldown
+        self.rules = {}
+        self._books = {}
+        self._unanchored = {}
+        self._cooling = []
+        self._stale = 0
+        self._next_id = 1
+        self._lock = threading.Lock()
+        self.evaluated = 0
+        self.fired = 0
+        self.suppressed = 0
+        self.journal = f"{path}.log" if path else None
+        self._offset = 0
+        self._journaled = 0
+        self._compactor = None
+        self._sig = None
+        self._lock_file = None
+        self._load()
+
+    def _stat(self, path):
+        try:
+            return os.stat(path)
+        except FileNotFoundError:
+            return None
+
+    def _signature(self):
+        snapshot, journal = self._stat(self.path), self._stat(self.journal)
+        return ((snapshot.st_mtime_ns, snapshot.st_ino, snapshot.st_size) if snapshot else None,
+                journal.st_ino if journal else None)
+
+    def _load(self):
+        # Anlık görüntü ya da günlük dosyası değiştiyse (başka süreç sıkıştırdıysa)
+        # durum baştan kurulur; yalnızca günlük uzadıysa yeni satırlar uygulanır
+        if not self.path:
+            return
+        sig = self._signature()
+        if sig != self._sig:
+            self._reset()
+            self._sig = sig
+        self._replay()
+
+    def _reset(self):
+        self.rules = {}
+        self._books = {}
+        self._unanchored = {}
+        self._cooling = []
+        self._stale = 0
+        self._offset = 0
+        self._journaled = 0
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            data = {}
+        self._next_id = data.get("next_id", 1)
+        for item in data.get("rules", []):
+            rule = AlertRule.from_dict(item)
+            self.rules[rule.id] = rule
+        self._arm_many(self.rules.values())
+
+    def _replay(self):
+        journal = self._stat(self.journal)
+        if journal is None or journal.st_size <= self._offset:
+            return
+        with open(self.journal, "rb") as f:
+            f.seek(self._offset)
+            data = f.read()
+        # Yazımı süren son satır tamamlanınca uygulanır
+        end = data.rfind(b"\n") + 1
+        changed = {}
+        for line in data[:end].splitlines():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            self._journaled += 1
+            if "remove" in entry:
+                if self.rules.pop(entry["remove"], None) is not None:
+                    self._stale += 2
+                changed.pop(entry["remove"], None)
+                continue
+            rule = AlertRule.from_dict(entry["rule"])
+            old = self.rules.get(rule.id)
+            if old is not None:
+                rule.generation = old.generation + 1
+                self._stale += 2
+            self.rules[rule.id] = rule
+            self._next_id = max(self._next_id, rule.id + 1)
+            changed[rule.id] = rule
+        self._offset += end
+        self._arm_many(changed.values())
+
+    @contextmanager
+    def _shared(self):
+        # Süreçler arası kilit: oku-değiştir-yaz sırasında başka süreç dosyayı ezmesin
+        if not self.path:
+            yield
+            return
+        if self._lock_file is None:
+            self._lock_file = open(f"{self.path}.lock", "a")
+        fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+        try:
+            self._load()
+            yield
+        finally:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _append(self, entries):
+        if not self.path:
+            return
+        data = "".join(json.dumps(entry) + "\n" for entry in entries).encode()
+        with open(self.journal, "ab") as f:
+            # Çöken bir yazıcının yarım bıraktığı satır atılır
+            if f.tell() > self._offset:
+                f.truncate(self._offset)
+            f.write(data)
+        self._offset += len(data)
+        self._journaled += len(entries)
+        self._sig = self._signature()
+        if self._journaled > len(self.rules) + ALERT_JOURNAL_SLACK and not self._compacting():
+            self._compactor = threading.Thread(target=self._compact_files, name="alerts-compact", daemon=True)
+            self._compactor.start()
+
+    def _compacting(self):
+        return self._compactor is not None and self._compactor.is_alive()
+
+    def _compact_files(self):
+        # Yeni anlık görüntü kilitsiz olarak diskteki görüntü ve günlükten kurulur;
+        # kilit yalnızca dosyalar değiştirilirken ve o arada eklenen satırlar taşınırken tutulur
+        sig = self._signature()
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            data = {}
+        next_id = data.get("next_id", 1)
+        rules = {item["id"]: item for item in data.get("rules", [])}
+        with open(self.journal, "rb") as f:
+            raw = f.read()
+        end = raw.rfind(b"\n") + 1
+        for line in raw[:end].splitlines():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if "remove" in entry:
+                rules.pop(entry["remove"], None)
+            else:
+                rules[entry["rule"]["id"]] = entry["rule"]
+                next_id = max(next_id, entry["rule"]["id"] + 1)
+        tmp, journal_tmp = f"{self.path}.{os.getpid()}.tmp", f"{self.journal}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            f.write(json.dumps({"next_id": next_id, "rules": list(rules.values())}))
+        with self._lock, self._shared():
+            if self._signature() != sig:
+                # Başka süreç bu arada sıkıştırdı
+                os.remove(tmp)
+                return
+            with open(self.journal, "rb") as f:
+                f.seek(end)
+                tail = f.read()
+            with open(journal_tmp, "wb") as f:
+                f.write(tail)
+            # Yeni günlük yeni bir inode ile gelir; diğer süreçler durumu baştan yükler.
+            # İki değişim arasında çökülürse eski günlük yeni görüntünün üzerine aynı sonucu verir.
+            os.replace(tmp, self.path)
+            os.replace(journal_tmp, self.journal)
+            self._offset -= end
+            self._journaled = tail.count(b"\n")
+            self._sig = self._signature()
+
+    def close(self):
+        if self._compactor is not None:
+            self._compactor.join()
+
+    def _book(self, symbol):
+        books = self._books.get(symbol)
+        if books is None:
+            books = self._books[symbol] = (ThresholdBook(rising=True), ThresholdBook(rising=False))
+        return books
+
+    def _thresholds(self, rule):
+        # Kuralın bir sonraki durum değişikliği için (yükselen mi, seviye, girdi) listesi
+        entry = (rule.id, rule.generation)
+        if rule.kind == "change":
+            step = rule.anchor * rule.value / 100
+            return [(True, rule.anchor + step, entry + (FIRE,)), (False, rule.anchor - step, entry + (FIRE,))]
+        if rule.kind == "above":
+            if rule.armed:
+                return [(True, rule.value, entry + (FIRE,))]
+            return [(False, rule.value * (1 - rule.hysteresis), entry + (REARM,))]
+        if rule.armed:
+            return [(False, rule.value, entry + (FIRE,))]
+        return [(True, rule.value * (1 + rule.hysteresis), entry + (REARM,))]
+
+    def _arm_many(self, rules):
+        for rule in rules:
+            if rule.kind == "change" and rule.anchor is None:
+                self._unanchored.setdefault(rule.symbol, []).append((rule.id, rule.generation))
+                continue
+            up, down = self._book(rule.symbol)
+            for rising, level, entry in self._thresholds(rule):
+                (up if rising else down).add(level, entry)
+
+    def _arm(self, rule):
+        self._arm_many([rule])
+
+    def _cool(self, rule):
+        heapq.heappush(self._cooling, (rule.last_fired + rule.cooldown, rule.id, rule.generation))
+
+    def _in_cooldown(self, rule, ts):
+        return rule.last_fired is not None and ts < rule.last_fired + rule.cooldown
+
+    def add(self, chat_id, symbol, kind, value, price=None, hysteresis=None, cooldown=None):
+        if kind not in KINDS:
+            raise ValueError(f"kural türü şunlardan biri olmalı: {', '.join(KINDS)}")
+        value = float(value)
+        if not math.isfinite(value) or value <= 0 or (kind == "change" and value >= 100):
+            raise ValueError("kural değeri pozitif olmalı (yüzde için 100'den küçük)")
+        hysteresis = self.hysteresis if hysteresis is None else float(hysteresis)
+        cooldown = self.cooldown if cooldown is None else float(cooldown)
+        if not (math.isfinite(hysteresis) and math.isfinite(cooldown)) or hysteresis < 0 or cooldown < 0:
+            raise ValueError("histerezis ve bekleme süresi sonlu ve negatif olmayan sayılar olmalı")
+        with self._lock, self._shared():
+            rule = AlertRule(self._next_id, chat_id, symbol, kind, value, hysteresis, cooldown,
+                             anchor=float(price) if kind == "change" and price is not None else None)
+            self._next_id += 1
+            # Fiyat zaten eşiğin ötesindeyse kural hemen tetiklenmez, geri dönüşü bekler
+            if kind == "above" and price is not None and price >= value:
+                rule.armed = False
+            elif kind == "below" and price is not None and price <= value:
+                rule.armed = False
+            self.rules[rule.id] = rule
+            self._arm(rule)
+            self._append([{"rule": rule.to_dict()}])
+            return rule
+
+    def remove(self, rule_id, chat_id=None):
+        with self._lock, self._shared():
+            rule = self.rules.get(rule_id)
+            if rule is None or (chat_id is not None and rule.chat_id != str(chat_id)):
+                return False
+            del self.rules[rule_id]
+            self._stale += 2
+            self._append([{"remove": rule_id}])
+            return True
+
+    def for_chat(self, chat_id):
+        with self._lock:
+            self._load()
+            return [rule for rule in self.rules.values() if rule.chat_id == str(chat_id)]
+
+    def _valid(self, entry):
+        rule = self.rules.get(entry[0])
+        return rule is not None and rule.generation == entry[1]
+
+    def _compact(self):
+        for books in self._books.values():
+            for book in books:
+                book.compact(self._valid)
+        self._stale = 0
+
+    def evaluate(self, symbol, price, ts):
+        # Tetiklenen (kural, mesaj) çiftlerini döndürür; maliyet O(log n + k)
+        fired = []
+        with self._lock, self._shared():
+            self.evaluated += 1
+            dirty = {}
+            ready = []
+            while self._cooling and self._cooling[0][0] <= ts:
+                _, rule_id, generation = heapq.heappop(self._cooling)
+                rule = self.rules.get(rule_id)
+                if rule is not None and rule.generation == generation:
+                    ready.append(rule)
+            for rule_id, generation in self._unanchored.pop(symbol, []):
+                rule = self.rules.get(rule_id)
+                if rule is not None and rule.generation == generation:
+                    rule.anchor = price
+                    ready.append(rule)
+                    dirty[rule.id] = rule
+            self._arm_many(ready)
+            # Bu tick'te durum değiştiren kurallar yeni eşikleriyle tick sonunda toplu yerleşir
+            ready = []
+            up, down = self._book(symbol)
+            for rule_id, generation, action in up.pop_triggered(price) + down.pop_triggered(price):
+                rule = self.rules.get(rule_id)
+                if rule is None or rule.generation != generation:
+                    self._stale -= 1
+                    continue
+                # Aynı kuralın diğer yöndeki eşiği bu noktadan sonra geçersizdir
+                rule.generation += 1
+                if action == REARM:
+                    rule.armed = True
+                    dirty[rule.id] = rule
+                    if self._in_cooldown(rule, ts):
+                        self._cool(rule)
+                    else:
+                        ready.append(rule)
+                    continue
+                if rule.kind == "change":
+                    self._stale += 1
+                if self._in_cooldown(rule, ts):
+                    self.suppressed += 1
+                    self._cool(rule)
+                    continue
+                fired.append((rule, rule.message(price)))
+                rule.last_fired = ts
+                if rule.kind == "change":
+                    rule.anchor = price
+                else:
+                    rule.armed = False
+                ready.append(rule)
+                dirty[rule.id] = rule
+            self._arm_many(ready)
+            self.fired += len(fired)
+            if self._stale > len(self.rules) + 1024:
+                self._compact()
+            if dirty:
+                self._append([{"rule": rule.to_dict()} for rule in dirty.values()])
+        return fired
+
+    def stats(self):
+        with self._lock:
+            return {
+                "rules": len(self.rules),
+                "thresholds": sum(len(book) for books in self._books.values() for book in books),
+                "cooling": len(self._cooling),
+                "evaluated": self.evaluated,
+                "fired": self.fired,
+                "suppressed": self.suppressed,
+            }
+
+
+def parse_command(text, default_symbol):
+    # "/alert above 2400 [XAGUSD]", "/alert change 1" -> (tür, değer, sembol)
+    parts = text.split()
+    if len(parts) < 3 or parts[1].lower() not in KINDS:
+        raise ValueError("kullanım: /alert above|below|change <değer> [SEMBOL]")
+    try:
+        value = float(parts[2].replace(",", ".").rstrip("%"))
+    except ValueError:
+        raise ValueError(f"geçersiz değer: {parts[2]}")
+    symbol = parts[3].upper() if len(parts) > 3 else default_symbol
+    return parts[1].lower(), value, symbol
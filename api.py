@@ -0,0 +1,253 @@
+import os
+import hmac
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from flask import Blueprint, Response, request, abort, jsonify
+
+INTERVALS = {"10m": 600, "1h": 3600, "1d": 86400, "1w": 604800}
+# rollups.OFFSETS ile aynı: haftalık kovalar pazartesi 00:00 UTC'de başlar
+INTERVAL_OFFSETS = {"1w": 3 * 86400}
+DEFAULT_RANGES = {"10m": 86400, "1h": 86400, "1d": 30 * 86400, "1w": 365 * 86400}
+DAY_SECONDS = 86400
+MAX_POINTS = 2000
+API_CACHE_ENTRIES = int(os.getenv("API_CACHE_ENTRIES", "512"))
+# Hazır toplamı olmayan aralıklar ham tick'lerden kurulur; tarama bu süreyle sınırlıdır,
+# daha uzun geçmiş 1h/1d toplamlarından istenmelidir
+RAW_MAX_RANGE = 14 * DAY_SECONDS
+
+
+class ResponseCache:
+    # Yanıt gövdeleri JSON olarak bir kez serileştirilir; her tick'te ilgili
+    # sembolün girdileri silinir. Anahtarın ikinci elemanı sembol olmalıdır.
+    # En fazla `max_entries` girdi tutulur; dolunca en uzun süredir kullanılmayan atılır.
+    def __init__(self, max_entries=API_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    def get(self, key, build):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+            version = self._versions.get(key[1], 0)
+        body = json.dumps(build(), separators=(",", ":")).encode()
+        entry = (body, hashlib.sha1(body).hexdigest()[:20])
+        with self._lock:
+            # Hesaplama sırasında yeni tick geldiyse eski sonucu önbelleğe yazma
+            if self._versions.get(key[1], 0) == version:
+                self._entries[key] = entry
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evicted += 1
+        return entry
+
+    def invalidate(self, symbol=None):
+        with self._lock:
+            if symbol is None:
+                self._entries.clear()
+                self._versions = {k: v + 1 for k, v in self._versions.items()}
+            else:
+                self._entries = OrderedDict((k, v) for k, v in self._entries.items() if k[1] != symbol)
+                self._versions[symbol] = self._versions.get(symbol, 0) + 1
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses, "evicted": self.evicted}
+
+
+def ohlc(ts, prices, step):
+    # Kova başlangıçları ve [açılış, yüksek, düşük, kapanış] sütunları; listeye
+    # çevirme seyreltmeden sonra yapılır
+    import numpy as np
+
+    if not len(ts):
+        return np.empty(0, dtype=np.int64), np.empty((0, 4))
+    buckets = ts // step * step
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(buckets)) + 1))
+    ends = np.concatenate((starts[1:], [len(ts)]))
+    return buckets[starts], np.column_stack((
+        prices[starts],
+        np.maximum.reduceat(prices, starts),
+        np.minimum.reduceat(prices, starts),
+        prices[ends - 1],
+    ))
+
+
+def latest_price(state):
+    import numpy as np
+
+    if state.store.last is None:
+        return None
+    ts, price = state.store.last
+    # Son 24 saati kapsayacak kadar kuyruk okunur (10 dakikalık tick'lerle ~144 satır)
+    tail_ts, tail_prices = state.store.read(-400)
+    index = int(np.searchsorted(tail_ts, ts - DAY_SECONDS))
+    base = float(tail_prices[min(index, len(tail_prices) - 1)])
+    return {
+        "symbol": state.symbol,
+        "timestamp": ts,
+        "price": price,
+        "change": price - base,
+        "change_pct": (price - base) / base * 100 if base else 0.0,
+    }
+
+
+def candles(state, interval, start, end, max_points=MAX_POINTS):
+    last = state.store.last
+    end = end if end is not None else (last[0] if last else int(time.time()))
+    start = start if start is not None else end - DEFAULT_RANGES[interval]
+    if interval in state.rollups.rollups:
+        # Hazır toplamlardan: tüm geçmişi taramadan yalnızca aralıktaki kovalar
+        starts, values = state.rollups.query(interval, start, end)
+    else:
+        ts, prices = state.store.range(max(start, end - RAW_MAX_RANGE), end)
+        starts, values = ohlc(ts, prices, INTERVALS[interval])
+    if len(starts) > max_points:
+        # Seyreltme NumPy dizileri üzerinde; yalnızca seçilen satırlar listeye çevrilir
+        from rollups import lttb
+
+        keep = lttb(starts, values[:, 3], max_points)
+        starts, values = starts[keep], values[keep]
+    rows = [[t] + row for t, row in zip(starts.tolist(), values.tolist())]
+    return {"symbol": state.symbol, "interval": interval, "candles": rows}
+
+
+def prediction(state, reader, horizon):
+    artifact = reader.get()
+    if artifact is None or state.store.last is None:
+        return None
+    current = state.store.last[1]
+    target = state.store.last[0] + horizon
+    predicted = artifact.predict(target)
+    return {
+        "symbol": state.symbol,
+        "current_price": current,
+        "predicted_price": predicted,
+        "target_timestamp": target,
+        "direction": "down" if predicted < current else "up",
+        "model": artifact.meta,
+    }
+
+
+def create_api(registry, get_state, readers, cache, horizon, hub, alerts=None, subscribers=None,
+               alerts_token=None):
+    api = Blueprint("api", __name__, url_prefix="/api")
+
+    def symbol_arg():
+        symbol = request.args.get("symbol", registry.primary).upper()
+        if symbol not in registry:
+            abort(404, f"bilinmeyen sembol: {symbol}")
+        return symbol
+
+    def int_arg(name):
+        value = request.args.get(name)
+        try:
+            return int(value) if value is not None else None
+        except ValueError:
+            abort(400, f"{name} tamsayı olmalı")
+
+    def respond(key, build):
+        body, etag = cache.get(key, build)
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            response = Response(body, mimetype="application/json")
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "no-cache"
+        return response
+
+    @api.route("/price/latest")
+    def price_latest():
+        symbol = symbol_arg()
+        return respond(("price", symbol), lambda: latest_price(get_state(symbol)))
+
+    @api.route("/candles")
+    def price_candles():
+        symbol = symbol_arg()
+        interval = request.args.get("interval", "1h")
+        if interval not in INTERVALS:
+            abort(400, f"interval şunlardan biri olmalı: {', '.join(INTERVALS)}")
+        start, end = int_arg("start"), int_arg("end")
+        max_points = min(int_arg("max_points") or MAX_POINTS, MAX_POINTS)
+        if max_points < 3:
+            abort(400, "max_points en az 3 olmalı")
+        # Kova sınırlarına hizalanır: aynı mumları veren istekler aynı önbellek anahtarını paylaşır
+        step, offset = INTERVALS[interval], INTERVAL_OFFSETS.get(interval, 0)
+        if start is not None:
+            start = (start - offset) // step * step + offset
+        if end is not None:
+            end = (end - offset) // step * step + offset + step - 1
+        return respond(("candles", symbol, interval, start, end, max_points),
+                       lambda: candles(get_state(symbol), interval, start, end, max_points))
+
+    @api.route("/prediction/latest")
+    def prediction_latest():
+        symbol = symbol_arg()
+        return respond(("prediction", symbol), lambda: prediction(get_state(symbol), readers[symbol], horizon))
+
+    @api.route("/stream")
+    def stream():
+        client = hub.subscribe()
+        if client is None:
+            abort(503, "akış istemci sınırı dolu")
+        return Response(hub.stream(client), mimetype="text/event-stream",
+                        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+    if alerts is None:
+        return api
+
+    def authorize(chat_id):
+        # Alarm uçları paylaşılan belirteç ister ve yalnızca aktif abonelerin sohbetlerine açıktır
+        if not alerts_token:
+            abort(503, "alarm API'si kapalı: ALERTS_API_TOKEN ayarlanmamış")
+        supplied = request.headers.get("Authorization", "").encode()
+        if not hmac.compare_digest(supplied, f"Bearer {alerts_token}".encode()):
+            abort(401, "geçersiz yetki belirteci")
+        if not chat_id:
+            abort(400, "chat_id gerekli")
+        if subscribers is not None and not subscribers.is_active(chat_id):
+            abort(403, f"aktif abone değil: {chat_id}")
+        return str(chat_id)
+
+    @api.route("/alerts")
+    def alert_list():
+        chat_id = authorize(request.args.get("chat_id"))
+        return jsonify([rule.to_dict() for rule in alerts.for_chat(chat_id)])
+
+    @api.route("/alerts", methods=["POST"])
+    def alert_create():
+        body = request.get_json(silent=True)
+        if not isinstance(body, dict):
+            abort(400, "gövde JSON nesnesi olmalı")
+        chat_id = authorize(body.get("chat_id"))
+        symbol = str(body.get("symbol", registry.primary)).upper()
+        if symbol not in registry:
+            abort(404, f"bilinmeyen sembol: {symbol}")
+        last = get_state(symbol).store.last
+        try:
+            rule = alerts.add(chat_id, symbol, body.get("kind"), body.get("value", 0),
+                              price=last[1] if last else None,
+                              hysteresis=body.get("hysteresis"), cooldown=body.get("cooldown"))
+        except (TypeError, ValueError) as e:
+            abort(400, str(e))
+        return jsonify(rule.to_dict()), 201
+
+    @api.route("/alerts/<int:rule_id>", methods=["DELETE"])
+    def alert_delete(rule_id):
+        chat_id = authorize(request.args.get("chat_id"))
+        if not alerts.remove(rule_id, chat_id):
+            abort(404, f"kural bulunamadı: {rule_id}")
+        return Response(status=204)
+
+    return api
@@ -0,0 +1,239 @@
+import os
+import json
+import time
+import logging
+import threading
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from zoneinfo import ZoneInfo
+
+BACKFILL_STATE = os.getenv("BACKFILL_STATE", "backfill.json")
+BACKFILL_MAX_DAYS = int(os.getenv("BACKFILL_MAX_DAYS", "30"))
+BACKFILL_PAGE_DAYS = int(os.getenv("BACKFILL_PAGE_DAYS", "5"))
+BACKFILL_CONCURRENCY = int(os.getenv("BACKFILL_CONCURRENCY", "4"))
+BACKFILL_GAP_FACTOR = float(os.getenv("BACKFILL_GAP_FACTOR", "1.5"))
+TICK_INTERVAL = int(os.getenv("TICK_INTERVAL_SECONDS", "600"))
+FMP_CHART_INTERVAL = os.getenv("FMP_CHART_INTERVAL", "5min")
+# historical-chart tarihleri borsa saatiyle döner
+FMP_CHART_TZ = os.getenv("FMP_CHART_TZ", "America/New_York")
+
+
+def find_gaps(ts, interval=TICK_INTERVAL, factor=BACKFILL_GAP_FACTOR, now=None):
+    # Ardışık iki tick arası `factor * interval` saniyeden uzunsa (önceki, sonraki)
+    # aralığı boşluktur; `now` verilirse son tick'ten bu yana geçen süre de sayılır
+    import numpy as np
+
+    ts = np.asarray(ts, dtype=np.int64)
+    limit = factor * interval
+    if not len(ts):
+        return []
+    idx = np.flatnonzero(np.diff(ts) > limit)
+    gaps = [(int(ts[i]), int(ts[i + 1])) for i in idx]
+    if now is not None and now - ts[-1] > limit:
+        gaps.append((int(ts[-1]), int(now)))
+    return gaps
+
+
+def pages(gaps, tz, page_days=BACKFILL_PAGE_DAYS):
+    # Boşlukların kapsadığı günler birleştirilir; ardışık günler `page_days`
+    # günlük from/to sayfalarına bölünür (FMP tarihleri her iki uçta dahil)
+    days = set()
+    for start, end in gaps:
+        day = datetime.fromtimestamp(start, tz).date()
+        last = datetime.fromtimestamp(end, tz).date()
+        while day <= last:
+            days.add(day)
+            day += timedelta(days=1)
+    result = []
+    for day in sorted(days):
+        if result and day == result[-1][1] + timedelta(days=1) and (day - result[-1][0]).days < page_days:
+            result[-1][1] = day
+        else:
+            result.append([day, day])
+    return [(first.isoformat(), last.isoformat()) for first, last in result]
+
+
+def parse_chart(rows, tz):
+    ts, prices = [], []
+    for row in rows:
+        try:
+            stamp = datetime.strptime(row["date"], "%Y-%m-%d %H:%M:%S").replace(tzinfo=tz)
+            price = float(row["close"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if price > 0:
+            ts.append(int(stamp.timestamp()))
+            prices.append(price)
+    return ts, prices
+
+
+def select(ts, prices, gaps, interval=TICK_INTERVAL):
+    # Yalnızca boşlukların içine düşen çubuklar alınır; kenardaki gerçek tick'lere
+    # yarım aralıktan yakın olanlar atlanır ve her `interval` diliminden son çubuk tutulur
+    import numpy as np
+
+    ts = np.asarray(ts, dtype=np.int64)
+    prices = np.asarray(prices, dtype=np.float64)
+    order = np.argsort(ts, kind="stable")
+    ts, prices = ts[order], prices[order]
+    keep = np.zeros(len(ts), dtype=bool)
+    for start, end in gaps:
+        keep |= (ts >= start + interval // 2) & (ts <= end - interval // 2)
+    ts, prices = ts[keep], prices[keep]
+    if not len(ts):
+        return ts, prices
+    buckets = ts // interval
+    last = np.append(buckets[1:] != buckets[:-1], True)
+    return ts[last], prices[last]
+
+
+class Backfiller:
+    # Depodaki boşlukları FMP historical-chart sayfalarıyla doldurur. Sayfalar sınırlı
+    # eşzamanlılıkla çekilir ve her biri geldikçe kontrol noktası dosyasına yazılır;
+    # yarıda kesilen bir çalıştırma yalnızca eksik sayfaları yeniden çeker. Tüm
+    # satırlar sembol başına tek toplu eklemeyle depoya yazılır. Sağlayıcıda verisi
+    # olmayan aralıklar (hafta sonu, tatil) "tükenmiş" olarak işaretlenip tekrar istenmez.
+    def __init__(self, client, base_url, api_key, path=BACKFILL_STATE, concurrency=BACKFILL_CONCURRENCY,
+                 page_days=BACKFILL_PAGE_DAYS, max_days=BACKFILL_MAX_DAYS, interval=TICK_INTERVAL,
+                 factor=BACKFILL_GAP_FACTOR, chart_interval=FMP_CHART_INTERVAL, tz=FMP_CHART_TZ):
+        self.client = client
+        self.base_url = base_url
+        self.api_key = api_key
+        self.path = path
+        self.page_days = page_days
+        self.max_days = max_days
+        self.interval = interval
+        self.factor = factor
+        self.chart_interval = chart_interval
+        self.tz = ZoneInfo(tz)
+        self.runs = 0
+        self.fetched = 0
+        self.resumed = 0
+        self.failed = 0
+        self.inserted = 0
+        self.last_run = None
+        self._lock = threading.Lock()
+        self._run_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="backfill")
+        self.checkpoint = {}
+        self.reload()
+
+    def reload(self):
+        # İzleyici lider olduğunda önceki liderin kontrol noktası diskten yeniden okunur
+        with self._lock:
+            self.checkpoint = {}
+            if self.path and os.path.exists(self.path):
+                with open(self.path) as f:
+                    self.checkpoint = json.load(f)
+
+    def _save(self):
+        if not self.path:
+            return
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.checkpoint, f)
+        os.replace(tmp, self.path)
+
+    def _symbol(self, symbol):
+        return self.checkpoint.setdefault(symbol, {"pages": {}, "exhausted": []})
+
+    def gaps(self, store, now=None):
+        import numpy as np
+
+        now = int(time.time()) if now is None else int(now)
+        since = now - self.max_days * 86400
+        ts, _ = store.range(since)
+        # Pencere başlangıcından önce veri varsa pencere sınırı sanal bir tick sayılır
+        if len(store) and store.read(0, 1)[0][0] < since:
+            ts = np.concatenate(([since], ts))
+        return find_gaps(ts, self.interval, self.factor, now=now)
+
+    def _fetch(self, symbol, first, last):
+        url = (f"{self.base_url}/historical-chart/{self.chart_interval}/{symbol}"
+               f"?from={first}&to={last}&apikey={self.api_key}")
+        response = self.client.get(url, name="fmp_historical")
+        return parse_chart(response.json(), self.tz)
+
+    def run(self, state, now=None):
+        # Aynı anda tek çalıştırma: zamanlanmış iş başlangıç çalıştırmasıyla çakışırsa atlar
+        if not self._run_lock.acquire(blocking=False):
+            return 0
+        try:
+            return self._run(state, now)
+        finally:
+            self._run_lock.release()
+
+    def _run(self, state, now):
+        symbol = state.symbol
+        now = int(time.time()) if now is None else int(now)
+        with self._lock:
+            checkpoint = self._symbol(symbol)
+            # Pencere dışına düşen tükenmiş aralıklar unutulur
+            since = now - self.max_days * 86400
+            checkpoint["exhausted"] = [span for span in checkpoint["exhausted"] if span[1] > since]
+            exhausted = list(checkpoint["exhausted"])
+        gaps = [
+            gap for gap in self.gaps(state.store, now)
+            if not any(start <= gap[0] and gap[1] <= end for start, end in exhausted)
+        ]
+        self.runs += 1
+        self.last_run = now
+        if not gaps:
+            return 0
+        needed = pages(gaps, self.tz, self.page_days)
+        with self._lock:
+            done = dict(checkpoint["pages"])
+        todo = [page for page in needed if f"{page[0]}:{page[1]}" not in done]
+        self.resumed += len(needed) - len(todo)
+        logging.info(f"🧩 {symbol}: {len(gaps)} boşluk, {len(needed)} sayfa ({len(todo)} çekilecek)")
+
+        futures = {self._executor.submit(self._fetch, symbol, first, last): (first, last) for first, last in todo}
+        failed = 0
+        for future in as_completed(futures):
+            first, last = futures[future]
+            try:
+                ts, prices = future.result()
+            except Exception as e:
+                failed += 1
+                logging.warning(f"⚠️ {symbol} {first}..{last} geçmiş verisi alınamadı: {e}")
+                continue
+            with self._lock:
+                checkpoint["pages"][f"{first}:{last}"] = [ts, prices]
+                done[f"{first}:{last}"] = [ts, prices]
+                self._save()
+            self.fetched += 1
+        self.failed += failed
+
+        ts, prices = [], []
+        for first, last in needed:
+            page = done.get(f"{first}:{last}")
+            if page:
+                ts.extend(page[0])
+                prices.extend(page[1])
+        ts, prices = select(ts, prices, gaps, self.interval)
+        inserted = state.insert_history(ts, prices) if len(ts) else 0
+        self.inserted += inserted
+
+        with self._lock:
+            # Satırlar depoda; sayfalar kontrol noktasından silinir (farklı bir boşluk
+            # planından kalmış olanlar dahil). Tüm sayfalar geldiyse kalan boşluklar
+            # sağlayıcıda da boştur, yeniden istenmez.
+            checkpoint["pages"] = {}
+            if not failed:
+                checkpoint["exhausted"].extend([start, end] for start, end in gaps)
+            self._save()
+        logging.info(f"📥 {symbol}: {inserted} geçmiş tick eklendi")
+        return inserted
+
+    def stats(self):
+        with self._lock:
+            pending = sum(len(symbol["pages"]) for symbol in self.checkpoint.values())
+        return {
+            "runs": self.runs,
+            "pages_fetched": self.fetched,
+            "pages_resumed": self.resumed,
+            "pages_failed": self.failed,
+            "pages_pending": pending,
+            "inserted": self.inserted,
+            "last_run": self.last_run,
+        }
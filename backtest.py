@@ -0,0 +1,220 @@
+import os
+import sys
+import time
+import json
+import logging
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from tick_store import TickStore
+from online_model import OnlineLinearRegression
+from features import FeaturePipeline
+
+BACKTEST_RETRAIN = int(os.getenv("BACKTEST_RETRAIN", "144"))
+BACKTEST_WORKERS = int(os.getenv("BACKTEST_WORKERS", "0")) or os.cpu_count()
+
+
+class NaiveModel:
+    # Taban çizgisi: ufuktaki fiyat, tahmin anındaki son fiyata eşittir
+    name = "naive"
+
+    def prepare(self, ts, prices, target_idx):
+        self.prices = prices
+
+    def fit(self, lo, hi):
+        pass
+
+    def predict(self, idx, target_ts):
+        return self.prices[idx]
+
+
+class LinearTrendModel:
+    # main.py'deki model: fiyatın zamana göre doğrusal regresyonu (online toplamlar)
+    name = "linear"
+
+    def __init__(self, decay=1.0):
+        self.decay = decay
+
+    def prepare(self, ts, prices, target_idx):
+        self.ts = ts
+        self.prices = prices
+        self.model = OnlineLinearRegression(decay=self.decay)
+
+    def fit(self, lo, hi):
+        self.model.x0 = None
+        self.model.fit_arrays(self.ts[lo:hi], self.prices[lo:hi])
+
+    def predict(self, idx, target_ts):
+        slope, intercept = self.model._centered()
+        return intercept + slope * (target_ts - self.model.x0)
+
+
+class XGBoostModel:
+    # FeaturePipeline özelliklerinden ufuk getirisini tahmin eder. Eğitimde yalnızca
+    # hedefi eğitim anında bilinen satırlar kullanılır (ileriye sızıntı yok).
+    name = "xgboost"
+
+    def __init__(self, n_estimators=100, max_depth=3, learning_rate=0.05):
+        import xgboost
+
+        # Paralellik süreç havuzundan gelir; her işçide tek iş parçacığı
+        self.params = {"n_estimators": n_estimators, "max_depth": max_depth, "learning_rate": learning_rate,
+                       "tree_method": "hist", "n_jobs": 1, "verbosity": 0}
+        self.xgboost = xgboost
+
+    def prepare(self, ts, prices, target_idx):
+        pipeline = FeaturePipeline(capacity=max(len(ts), 1))
+        pipeline.extend(ts, prices)
+        self.features = pipeline.matrix
+        self.prices = prices
+        self.target_idx = target_idx
+        self.model = None
+
+    def fit(self, lo, hi):
+        rows = np.arange(lo, hi)
+        rows = rows[self.target_idx[rows] < hi]
+        x = self.features[rows]
+        ok = ~np.isnan(x).any(axis=1)
+        if ok.sum() < 50:
+            return
+        rows, x = rows[ok], x[ok]
+        y = self.prices[self.target_idx[rows]] / self.prices[rows] - 1
+        self.model = self.xgboost.XGBRegressor(**self.params).fit(x, y)
+
+    def predict(self, idx, target_ts):
+        if self.model is None:
+            return self.prices[idx]
+        x = np.nan_to_num(self.features[idx])
+        return self.prices[idx] * (1 + self.model.predict(x))
+
+
+MODELS = {"naive": NaiveModel, "linear": LinearTrendModel, "xgboost": XGBoostModel}
+
+
+def available_models(names):
+    models = []
+    for name in names:
+        if name not in MODELS:
+            raise ValueError(f"bilinmeyen model: {name} ({', '.join(MODELS)})")
+        try:
+            MODELS[name]()
+        except ImportError as e:
+            logging.warning(f"⚠️ {name} modeli atlandı: {e}")
+            continue
+        models.append(name)
+    return models
+
+
+def walk_forward(model, ts, prices, window, horizon, retrain=BACKTEST_RETRAIN):
+    # Her `retrain` tick'te model yalnızca o ana kadarki (isteğe bağlı olarak son
+    # `window`) tick'lerle yeniden eğitilir ve sonraki bloktaki her tick için
+    # `horizon` saniye sonrasının fiyatı tahmin edilir. Hedef, o zamandan sonraki ilk tick'tir.
+    target_idx = np.searchsorted(ts, ts + horizon)
+    model.prepare(ts, prices, target_idx)
+    first = max(window or retrain, 2)
+    last = int(np.searchsorted(target_idx, len(ts)))
+    origins, predictions = [], []
+    for start in range(first, last, retrain):
+        idx = np.arange(start, min(start + retrain, last))
+        model.fit(max(start - window, 0) if window else 0, start)
+        origins.append(idx)
+        predictions.append(model.predict(idx, ts[idx] + horizon))
+    if not origins:
+        return np.empty(0, dtype=np.int64), np.empty(0), target_idx
+    return np.concatenate(origins), np.concatenate(predictions), target_idx
+
+
+def score(prices, origins, predicted, target_idx):
+    if not len(origins):
+        return {"samples": 0, "mae": None, "directional_accuracy": None}
+    current = prices[origins]
+    actual = prices[target_idx[origins]]
+    move = np.sign(actual - current)
+    call = np.sign(predicted - current)
+    # Yön isabeti yalnızca hem fiyatın hem tahminin bir yön gösterdiği noktalarda
+    # ölçülür; naive model hiç yön vermediği için None döner
+    counted = (move != 0) & (call != 0)
+    return {
+        "samples": int(len(origins)),
+        "mae": float(np.mean(np.abs(predicted - actual))),
+        "directional_accuracy": float((call[counted] == move[counted]).mean()) if counted.any() else None,
+    }
+
+
+def run_config(config):
+    # Süreç havuzunda çalışır; tick'ler her işçide memmap ile açılır, kopyalanmaz
+    started = time.perf_counter()
+    # Salt okunur: canlı depoda onarım/birleştirme kurtarması yapılmaz, geçici segmentlere dokunulmaz
+    store = TickStore(os.path.join(config["tick_dir"], config["symbol"]), readonly=True)
+    ts, prices = store.read()
+    store.close()
+    model = MODELS[config["model"]]()
+    origins, predicted, target_idx = walk_forward(
+        model, ts, np.asarray(prices, dtype=np.float64), config["window"], config["horizon"], config["retrain"]
+    )
+    result = dict(config)
+    result.update(score(prices, origins, predicted, target_idx))
+    result["wall_seconds"] = round(time.perf_counter() - started, 3)
+    return result
+
+
+def run(tick_dir, symbol, models, windows, horizons, retrain=BACKTEST_RETRAIN, workers=BACKTEST_WORKERS):
+    if not os.path.isdir(os.path.join(tick_dir, symbol)):
+        raise FileNotFoundError(f"tick deposu bulunamadı: {os.path.join(tick_dir, symbol)}")
+    configs = [
+        {"tick_dir": tick_dir, "symbol": symbol, "model": model, "window": window, "horizon": horizon, "retrain": retrain}
+        for model, window, horizon in itertools.product(models, windows, horizons)
+    ]
+    results = []
+    with ProcessPoolExecutor(max_workers=min(workers, len(configs)) or 1) as pool:
+        futures = [pool.submit(run_config, config) for config in configs]
+        for future in as_completed(futures):
+            result = future.result()
+            logging.info(
+                f"🧪 {result['model']} pencere={result['window']} ufuk={result['horizon']}s: "
+                f"MAE={result['mae']} yön={result['directional_accuracy']} ({result['wall_seconds']}s)"
+            )
+            results.append(result)
+    # Aynı pencere ve ufuktaki naive sonuca göre göreli MAE
+    naive = {(r["window"], r["horizon"]): r["mae"] for r in results if r["model"] == "naive"}
+    for result in results:
+        base = naive.get((result["window"], result["horizon"]))
+        result["mae_vs_naive"] = result["mae"] / base if base and result["mae"] is not None else None
+    results.sort(key=lambda r: (r["horizon"], r["window"] or 0, r["model"]))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tahmin modelleri için ileri yürüyen geriye dönük test")
+    parser.add_argument("--tick-dir", default=os.getenv("TICK_DIR", "ticks"))
+    parser.add_argument("--symbol", default=os.getenv("SYMBOLS", "XAUUSD").split(",")[0].strip().upper())
+    parser.add_argument("--models", default="naive,linear,xgboost")
+    parser.add_argument("--windows", default="1008,4032,0", help="eğitim penceresi (tick); 0 = tüm geçmiş")
+    parser.add_argument("--horizons", default="3600,86400", help="tahmin ufku (saniye)")
+    parser.add_argument("--retrain", type=int, default=BACKTEST_RETRAIN, help="kaç tick'te bir yeniden eğitilir")
+    parser.add_argument("--workers", type=int, default=BACKTEST_WORKERS)
+    parser.add_argument("--output", help="sonuçların yazılacağı JSON dosyası (varsayılan: stdout)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    try:
+        models = available_models([name.strip() for name in args.models.split(",") if name.strip()])
+    except ValueError as e:
+        parser.error(str(e))
+    windows = [int(w) or None for w in args.windows.split(",")]
+    horizons = [int(h) for h in args.horizons.split(",")]
+    try:
+        results = run(args.tick_dir, args.symbol, models, windows, horizons, args.retrain, args.workers)
+    except FileNotFoundError as e:
+        parser.error(str(e))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
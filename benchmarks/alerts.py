@@ -0,0 +1,145 @@
+import os
+import sys
+import time
+import json
+import random
+import argparse
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from alerts import AlertEngine, KINDS
+
+
+class ScanEngine:
+    # Karşılaştırma için: her tick'te tüm kuralları tek tek dolaşan saf uygulama
+    def __init__(self, rules):
+        self.rules = [dict(rule) for rule in rules]
+
+    def evaluate(self, symbol, price, ts):
+        fired = []
+        for rule in self.rules:
+            if rule["symbol"] != symbol:
+                continue
+            cooling = rule["last_fired"] is not None and ts < rule["last_fired"] + rule["cooldown"]
+            if rule["kind"] == "change":
+                if rule["anchor"] is None:
+                    rule["anchor"] = price
+                    continue
+                if abs(price - rule["anchor"]) < rule["anchor"] * rule["value"] / 100:
+                    continue
+                if not cooling:
+                    fired.append(rule["id"])
+                    rule["last_fired"] = ts
+                    rule["anchor"] = price
+                continue
+            above = rule["kind"] == "above"
+            if not rule["armed"]:
+                band = rule["value"] * (1 - rule["hysteresis"] if above else 1 + rule["hysteresis"])
+                if (price <= band) if above else (price >= band):
+                    rule["armed"] = True
+                continue
+            if ((price >= rule["value"]) if above else (price <= rule["value"])) and not cooling:
+                fired.append(rule["id"])
+                rule["last_fired"] = ts
+                rule["armed"] = False
+        return fired
+
+
+def make_rules(count, price, seed):
+    rng = random.Random(seed)
+    rules = []
+    for i in range(count):
+        kind = KINDS[i % len(KINDS)]
+        # Panelin sunduğu %0.5 / %1 / %2 seçenekleri ve fiyatın ±%5'i içindeki seviyeler
+        value = rng.choice((0.5, 1.0, 2.0)) if kind == "change" else round(price * rng.uniform(0.95, 1.05), 2)
+        rules.append({"chat_id": i % 5000, "symbol": "XAUUSD", "kind": kind, "value": value,
+                      "hysteresis": 0.002, "cooldown": rng.choice((600, 1800, 3600))})
+    return rules
+
+
+def price_path(ticks, price, seed, volatility=0.0008):
+    # 10 dakikalık adımlarla geometrik rastgele yürüyüş (altın için ~%0.08 adım oynaklığı)
+    rng = random.Random(seed + 1)
+    for _ in range(ticks):
+        price *= 1 + rng.gauss(0, volatility)
+        yield price
+
+
+def run(rules, ticks, seed=0, check=0, memory=False):
+    with tempfile.TemporaryDirectory() as tmp:
+        # Varsayılan olarak kalıcılık açık: her tick değişen kuralları diske yazar
+        return _run(rules, ticks, seed, check, None if memory else os.path.join(tmp, "alerts.json"))
+
+
+def _run(rules, ticks, seed, check, path):
+    price = 2300.0
+    specs = make_rules(rules, price, seed)
+    engine = AlertEngine(path=path)
+    start = time.perf_counter()
+    for spec in specs:
+        engine.add(price=price, **spec)
+    build = time.perf_counter() - start
+
+    latencies = []
+    fired = 0
+    ts = 1_700_000_000
+    for p in price_path(ticks, price, seed):
+        ts += 600
+        t = time.perf_counter()
+        fired += len(engine.evaluate("XAUUSD", p, ts))
+        latencies.append(time.perf_counter() - t)
+    latencies.sort()
+    pick = lambda q: round(latencies[min(int(q * len(latencies)), len(latencies) - 1)] * 1e6, 1)
+    result = {
+        "rules": rules,
+        "ticks": ticks,
+        "persisted": path is not None,
+        "build_seconds": round(build, 3),
+        "fired": fired,
+        "p50_us": pick(0.5),
+        "p90_us": pick(0.9),
+        "p99_us": pick(0.99),
+        "max_us": round(latencies[-1] * 1e6, 1),
+        "mean_us": round(sum(latencies) / len(latencies) * 1e6, 1),
+    }
+    if path:
+        # Yeniden açılan motor görüntü ve günlükten aynı durumu kurmalı
+        engine.close()
+        reopened = AlertEngine(path=path)
+        if {k: r.to_dict() for k, r in reopened.rules.items()} != {k: r.to_dict() for k, r in engine.rules.items()}:
+            raise SystemExit("kalıcı durum bellekteki durumla uyuşmuyor")
+
+    if check:
+        # Aynı kurallar ve fiyat yoluyla tarayan uygulama aynı tetiklemeleri üretmeli
+        engine = AlertEngine(path=None)
+        scan = ScanEngine(engine.add(price=price, **spec).to_dict() for spec in specs)
+        ts = 1_700_000_000
+        scan_time = 0.0
+        for p in price_path(check, price, seed):
+            ts += 600
+            expected = sorted(rule.id for rule, _ in engine.evaluate("XAUUSD", p, ts))
+            t = time.perf_counter()
+            actual = sorted(scan.evaluate("XAUUSD", p, ts))
+            scan_time += time.perf_counter() - t
+            if expected != actual:
+                raise SystemExit(f"uyuşmazlık: ts={ts} motor={len(expected)} tarama={len(actual)}")
+        result["scan_mean_us"] = round(scan_time / check * 1e6, 1)
+        result["checked_ticks"] = check
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Alarm motoru kıyaslaması")
+    parser.add_argument("--rules", type=int, default=100000)
+    parser.add_argument("--ticks", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--check", type=int, default=200, help="tarama uygulamasıyla doğrulanacak tick sayısı (0: kapalı)")
+    parser.add_argument("--memory", action="store_true", help="kalıcılık kapalı (yalnızca bellek içi)")
+    args = parser.parse_args()
+    print(json.dumps(run(args.rules, args.ticks, args.seed, args.check, args.memory)))
+
+
+if __name__ == "__main__":
+    main()
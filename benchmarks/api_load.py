@@ -0,0 +1,74 @@
+import time
+import json
+import argparse
+import threading
+import requests
+
+ENDPOINTS = ["/api/price/latest", "/api/prediction/latest", "/api/candles?interval=1h"]
+
+
+def client_loop(base_url, deadline, use_etags, results, lock):
+    # Bir panel istemcisini taklit eder: ETag'leri saklar ve If-None-Match gönderir
+    session = requests.Session()
+    etags = {}
+    latencies = []
+    statuses = {}
+    while time.perf_counter() < deadline:
+        for path in ENDPOINTS:
+            headers = {"If-None-Match": etags[path]} if use_etags and path in etags else {}
+            start = time.perf_counter()
+            try:
+                response = session.get(base_url + path, headers=headers, timeout=10)
+                status = response.status_code
+                if "ETag" in response.headers:
+                    etags[path] = response.headers["ETag"]
+            except requests.RequestException:
+                status = "error"
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+    with lock:
+        results["latencies"].extend(latencies)
+        for status, count in statuses.items():
+            results["statuses"][str(status)] = results["statuses"].get(str(status), 0) + count
+
+
+def run(base_url, clients, duration, use_etags=True):
+    results = {"latencies": [], "statuses": {}}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(target=client_loop, args=(base_url, deadline, use_etags, results, lock))
+        for _ in range(clients)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    latencies = sorted(results["latencies"])
+    pick = lambda q: round(latencies[min(int(q * len(latencies)), len(latencies) - 1)] * 1000, 2) if latencies else None
+    return {
+        "clients": clients,
+        "duration_seconds": round(elapsed, 2),
+        "requests": len(latencies),
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "p50_ms": pick(0.5),
+        "p95_ms": pick(0.95),
+        "p99_ms": pick(0.99),
+        "statuses": results["statuses"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Panel API yük testi")
+    parser.add_argument("--url", default="http://127.0.0.1:8080")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--no-etag", action="store_true", help="If-None-Match göndermeden ölç")
+    args = parser.parse_args()
+    print(json.dumps(run(args.url, args.clients, args.duration, not args.no_etag)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import os
+import sys
+import time
+import json
+import socket
+import argparse
+import statistics
+import subprocess
+import tempfile
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def time_to_first_200(timeout=60.0):
+    # main.py'yi ayrı süreçte başlatır ve / ilk 200 dönene kadar geçen süreyi ölçer
+    port = free_port()
+    workdir = tempfile.mkdtemp(prefix="startup-")
+    env = dict(os.environ, PORT=str(port), DRIVE_BACKEND="local", TICK_DIR=os.path.join(workdir, "ticks"))
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "main.py")],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if proc.poll() is not None:
+                raise RuntimeError(f"main.py çıktı (kod {proc.returncode})")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError("/ zaman aşımına uğradı")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="main.py başlangıç süresi (time-to-first-200)")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    samples = [time_to_first_200() for _ in range(args.runs)]
+    print(json.dumps({
+        "runs": args.runs,
+        "median_seconds": round(statistics.median(samples), 4),
+        "min_seconds": round(min(samples), 4),
+        "max_seconds": round(max(samples), 4),
+    }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import os
+import sys
+import time
+import json
+import argparse
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+TICK_SECONDS = 600
+YEAR_SECONDS = 365 * 86400
+
+
+def rows_for_years(years, step=TICK_SECONDS):
+    return int(years * YEAR_SECONDS / step)
+
+
+def gbm(rows, start_price=2000.0, mu=0.05, sigma=0.15, step=TICK_SECONDS, end_ts=None, seed=0):
+    # Geometrik Brown hareketi: yıllık sürüklenme `mu` ve oynaklık `sigma`,
+    # `step` saniyelik adımlar. Son tick `end_ts` (varsayılan: şimdi) anına denk gelir.
+    rng = np.random.default_rng(seed)
+    dt = step / YEAR_SECONDS
+    log_returns = rng.normal((mu - sigma * sigma / 2) * dt, sigma * np.sqrt(dt), rows)
+    log_returns[0] = 0.0
+    prices = start_price * np.exp(np.cumsum(log_returns))
+    end_ts = int(time.time()) if end_ts is None else int(end_ts)
+    ts = end_ts - step * np.arange(rows - 1, -1, -1, dtype=np.int64)
+    return ts, prices
+
+
+def write_store(root, ts, prices):
+    from tick_store import TickStore
+
+    store = TickStore(root)
+    store.append_many(ts, prices)
+    store.close()
+
+
+def write_csv(path, ts, prices):
+    # Eski data.csv biçimi: yerel saatle "%Y-%m-%d %H:%M:%S", fiyat
+    import pandas as pd
+    from datetime import datetime
+
+    stamps = [datetime.fromtimestamp(t).strftime("%Y-%m-%d %H:%M:%S") for t in ts.tolist()]
+    pd.DataFrame({"timestamp": stamps, "price": prices}).to_csv(path, index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sentetik XAUUSD geçmişi (GBM, 10 dakikalık tick'ler)")
+    size = parser.add_mutually_exclusive_group(required=True)
+    size.add_argument("--rows", type=int)
+    size.add_argument("--years", type=float)
+    parser.add_argument("--start-price", type=float, default=2000.0)
+    parser.add_argument("--mu", type=float, default=0.05, help="yıllık sürüklenme")
+    parser.add_argument("--sigma", type=float, default=0.15, help="yıllık oynaklık")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--store", help="tick deposu klasörü (ör. ticks/XAUUSD)")
+    parser.add_argument("--csv", help="eski biçimde data.csv yolu")
+    args = parser.parse_args()
+    if not args.store and not args.csv:
+        parser.error("--store veya --csv gerekli")
+
+    rows = args.rows or rows_for_years(args.years)
+    ts, prices = gbm(rows, args.start_price, args.mu, args.sigma, seed=args.seed)
+    if args.store:
+        write_store(args.store, ts, prices)
+    if args.csv:
+        write_csv(args.csv, ts, prices)
+    print(json.dumps({"rows": rows, "first": int(ts[0]), "last": int(ts[-1]),
+                      "min": float(prices.min()), "max": float(prices.max())}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+import os
+import sys
+import json
+import time
+import pickle
+import shutil
+import logging
+import argparse
+import platform
+import resource
+import tempfile
+import threading
+import subprocess
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+REPO = os.path.dirname(ROOT)
+sys.path.insert(0, REPO)
+sys.path.insert(0, ROOT)
+
+from synthetic import gbm, write_store, write_csv
+
+DEFAULT_SIZES = "1000,100000,1000000"
+PHASES = ("ingest", "train", "predict", "drive")
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # FMP ve Telegram yerine: quote uç noktaları o anki sentetik fiyatı döner
+    price = 2000.0
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, body):
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if path.startswith("/quote"):
+            symbols = path.rsplit("/", 1)[-1].split(",")
+            self._send([{"symbol": symbol, "price": StubHandler.price} for symbol in symbols])
+        else:
+            self._send({"ok": True, "result": []})
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self._send({"ok": True, "result": {}})
+
+
+def start_stub():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}"
+
+
+def io_counters():
+    # /proc/self/io: rchar/wchar tüm okuma/yazma çağrıları, read/write_bytes disk
+    counters = {}
+    try:
+        with open("/proc/self/io") as f:
+            for line in f:
+                key, value = line.split(":")
+                counters[key] = int(value)
+    except OSError:
+        pass
+    return counters
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Phase:
+    def __init__(self):
+        self.latencies = []
+        self.io = {}
+
+    def run(self, fn, *args):
+        before = io_counters()
+        start = time.perf_counter()
+        result = fn(*args)
+        self.latencies.append(time.perf_counter() - start)
+        for key, value in io_counters().items():
+            self.io[key] = self.io.get(key, 0) + value - before.get(key, 0)
+        return result
+
+    def summary(self):
+        latencies = sorted(self.latencies)
+        n = len(latencies)
+        pick = lambda q: round(latencies[min(int(q * n), n - 1)] * 1000, 3)
+        return {
+            "p50_ms": pick(0.5),
+            "p95_ms": pick(0.95),
+            "p99_ms": pick(0.99),
+            "mean_ms": round(sum(latencies) / n * 1000, 3),
+            "read_bytes_per_tick": self.io.get("rchar", 0) // n,
+            "write_bytes_per_tick": self.io.get("wchar", 0) // n,
+            "disk_write_bytes_per_tick": self.io.get("write_bytes", 0) // n,
+        }
+
+
+class ReplayClock:
+    # time modülünün yerine geçer; yalnızca time() sabitlenen damgayı döndürür
+    now = None
+
+    def time(self):
+        return self.now
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+
+def run_current(rows, ticks, workdir, seed):
+    # Mevcut sürüm: tick deposu + online model + artefakt + DriveSync (yerel arka uç)
+    ts, prices = gbm(rows + ticks, seed=seed, end_ts=time.time() + ticks * 600)
+    write_store(os.path.join(workdir, "ticks", "XAUUSD"), ts[:rows], prices[:rows])
+    base_url = start_stub()
+    os.environ.update({
+        "FMP_BASE_URL": base_url, "TELEGRAM_BASE_URL": base_url, "FMP_API_KEY": "bench",
+        "TELEGRAM_TOKEN": "bench", "TELEGRAM_CHAT_ID": "1", "SYMBOLS": "XAUUSD",
+        "NOTIFY_SYMBOLS": "-", "DRIVE_BACKEND": "local", "DRIVE_SYNC_INTERVAL": "86400",
+        "TICK_DIR": os.path.join(workdir, "ticks"), "LEADER_ELECTION": "0",
+    })
+    os.chdir(workdir)
+    logging.disable(logging.INFO)
+    import main
+
+    load = Phase()
+    load.run(main.models.get)
+    # Aşamalar senkron ölçülsün diye arka plan işçileri durdurulur
+    for stage in main.stages:
+        stage.stop()
+    state = main.get_state("XAUUSD")
+    phases = {name: Phase() for name in PHASES}
+
+    def predict():
+        main.persist_model("XAUUSD")
+        main.send_telegram(main.build_prediction(state))
+
+    # fetch_data tick'i main.time.time() ile damgalar; üretilen zaman serisi yeniden oynatılır
+    clock = ReplayClock()
+    main.time = clock
+    for stamp, price in zip(ts[rows:].tolist(), prices[rows:].tolist()):
+        clock.now = stamp
+        StubHandler.price = price
+        phases["ingest"].run(main.fetch_data)
+        phases["train"].run(main.train_model, "XAUUSD")
+        phases["predict"].run(predict)
+        phases["drive"].run(main.drive_sync.flush)
+    return load, phases
+
+
+def run_legacy(rows, ticks, workdir, seed):
+    # İlk sürümün tick döngüsü: her tick'te data.csv okunup yeniden yazılır, model
+    # tüm geçmişten yeniden eğitilip pickle'lanır ve Drive'a kopyalanır.
+    import requests
+    import pandas as pd
+    from datetime import datetime
+    from sklearn.linear_model import LinearRegression
+
+    ts, prices = gbm(rows + ticks, seed=seed)
+    os.chdir(workdir)
+    write_csv("data.csv", ts[:rows], prices[:rows])
+    base_url = start_stub()
+    os.makedirs("drive_mirror", exist_ok=True)
+    phases = {name: Phase() for name in PHASES}
+
+    def save_data(price):
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        df = pd.concat([pd.read_csv("data.csv"), pd.DataFrame([[now, price]], columns=["timestamp", "price"])],
+                       ignore_index=True)
+        df.to_csv("data.csv", index=False)
+        return df
+
+    def train_model(df):
+        df["timestamp"] = pd.to_datetime(df["timestamp"])
+        df["timestamp_ordinal"] = df["timestamp"].map(datetime.toordinal)
+        model = LinearRegression().fit(df["timestamp_ordinal"].values.reshape(-1, 1), df["price"].values)
+        with open("model.pkl", "wb") as f:
+            pickle.dump(model, f)
+        return model
+
+    def send_prediction(df, model):
+        predicted = model.predict([[datetime.now().toordinal() + 1]])[0]
+        requests.post(f"{base_url}/botbench/sendMessage", data={"chat_id": "1", "text": f"{predicted:.2f} {df.iloc[-1]['price']:.2f}"})
+
+    def fetch():
+        return requests.get(f"{base_url}/quote/XAUUSD?apikey=bench").json()[0]["price"]
+
+    load = Phase()
+    load.run(pd.read_csv, "data.csv")
+    # fetch_data tick'i main.time.time() ile damgalar; üretilen zaman serisi yeniden oynatılır
+    clock = ReplayClock()
+    main.time = clock
+    for stamp, price in zip(ts[rows:].tolist(), prices[rows:].tolist()):
+        clock.now = stamp
+        StubHandler.price = price
+        df = phases["ingest"].run(lambda: save_data(fetch()))
+        model = phases["train"].run(train_model, df)
+        phases["predict"].run(send_prediction, df, model)
+        phases["drive"].run(shutil.copyfile, "model.pkl", os.path.join("drive_mirror", "model.pkl"))
+    return load, phases
+
+
+def child(mode, rows, ticks, seed):
+    workdir = tempfile.mkdtemp(prefix=f"bench-{mode}-{rows}-")
+    try:
+        runner = run_current if mode == "current" else run_legacy
+        load, phases = runner(rows, ticks, workdir, seed)
+        return {
+            "mode": mode,
+            "rows": rows,
+            "ticks": ticks,
+            "load_seconds": round(load.latencies[0], 3),
+            "load_read_bytes": load.io.get("rchar", 0),
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+            "phases": {name: phase.summary() for name, phase in phases.items()},
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=REPO, text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, tolerance):
+    # Aynı (mod, satır, aşama) için p50 ya da tepe RSS `tolerance` oranından fazla arttıysa gerileme
+    previous = {(r["mode"], r["rows"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for result in results:
+        old = previous.get((result["mode"], result["rows"]))
+        if old is None:
+            continue
+        for name, phase in result["phases"].items():
+            before = old["phases"].get(name, {}).get("p50_ms")
+            if before and phase["p50_ms"] > before * (1 + tolerance):
+                regressions.append(f"{result['mode']}/{result['rows']}/{name}: p50 {before} -> {phase['p50_ms']} ms")
+        if result["peak_rss_mb"] > old["peak_rss_mb"] * (1 + tolerance):
+            regressions.append(f"{result['mode']}/{result['rows']}: RSS {old['peak_rss_mb']} -> {result['peak_rss_mb']} MB")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tick döngüsü kıyaslaması (sentetik XAUUSD geçmişi)")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="geçmiş satır sayıları")
+    parser.add_argument("--ticks", type=int, default=50, help="her boyutta ölçülen tick sayısı")
+    parser.add_argument("--modes", default="current", help="current,legacy")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="sonuç JSON dosyası (varsayılan: stdout)")
+    parser.add_argument("--baseline", help="karşılaştırılacak önceki sonuç JSON dosyası")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        # Her ölçüm ayrı süreçte: tepe RSS ve G/Ç sayaçları diğer boyutlardan etkilenmez
+        print(json.dumps(child(args.modes, int(args.sizes), args.ticks, args.seed)))
+        return
+
+    results = []
+    for mode in args.modes.split(","):
+        for rows in [int(size) for size in args.sizes.split(",")]:
+            output = subprocess.check_output(
+                [sys.executable, os.path.abspath(__file__), "--child", "--modes", mode,
+                 "--sizes", str(rows), "--ticks", str(args.ticks), "--seed", str(args.seed)],
+                text=True,
+            )
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"{mode:>8} {rows:>9} satır: " + ", ".join(
+                f"{name} p50={phase['p50_ms']}ms" for name, phase in result["phases"].items()
+            ) + f", RSS={result['peak_rss_mb']}MB", file=sys.stderr)
+            results.append(result)
+
+    report = {"commit": git_commit(), "python": platform.python_version(), "platform": platform.platform(),
+              "created": int(time.time()), "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"⚠️ gerileme: {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
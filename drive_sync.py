@@ -0,0 +1,220 @@
+import os
+import json
+import shutil
+import hashlib
+import logging
+import threading
+import metrics
+
+DRIVE_SYNC_INTERVAL = float(os.getenv("DRIVE_SYNC_INTERVAL", "600"))
+DRIVE_SYNC_STATE = os.getenv("DRIVE_SYNC_STATE", ".drive_sync.json")
+DRIVE_SCOPES = ["https://www.googleapis.com/auth/drive.file"]
+DRIVE_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+def file_hash(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_json_atomic(path, data):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+class LocalDirBackend:
+    # Testler ve Drive'sız kurulumlar için: dosyaları bir klasöre kopyalar
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def upload(self, path, name, file_id=None):
+        file_id = file_id or name
+        tmp = os.path.join(self.root, f".{file_id}.tmp")
+        shutil.copyfile(path, tmp)
+        os.replace(tmp, os.path.join(self.root, file_id))
+        return file_id
+
+
+class GoogleDriveBackend:
+    def __init__(self, service, folder_id=None):
+        self.service = service
+        self.folder_id = folder_id
+
+    @classmethod
+    def from_credentials(cls, service_account_file=None, token_file=None, folder_id=None):
+        # Etkileşimsiz kimlik: servis hesabı ya da önceden alınmış (önbellekli) OAuth token
+        from googleapiclient.discovery import build
+
+        if service_account_file:
+            from google.oauth2 import service_account
+
+            creds = service_account.Credentials.from_service_account_file(service_account_file, scopes=DRIVE_SCOPES)
+        elif token_file and os.path.exists(token_file):
+            from google.oauth2.credentials import Credentials
+            from google.auth.transport.requests import Request
+
+            creds = Credentials.from_authorized_user_file(token_file, DRIVE_SCOPES)
+            if creds.expired and creds.refresh_token:
+                creds.refresh(Request())
+                with open(token_file, "w") as f:
+                    f.write(creds.to_json())
+        else:
+            raise RuntimeError("Drive kimlik bilgisi yok: GOOGLE_SERVICE_ACCOUNT_FILE veya GOOGLE_TOKEN_FILE ayarlayın")
+        return cls(build("drive", "v3", credentials=creds, cache_discovery=False), folder_id)
+
+    def _media(self, path):
+        from googleapiclient.http import MediaFileUpload
+
+        return MediaFileUpload(path, mimetype="application/octet-stream", resumable=True, chunksize=DRIVE_CHUNK_SIZE)
+
+    def _execute(self, request):
+        response = None
+        while response is None:
+            _, response = request.next_chunk(num_retries=3)
+        return response
+
+    def upload(self, path, name, file_id=None):
+        from googleapiclient.errors import HttpError
+
+        if file_id:
+            try:
+                request = self.service.files().update(fileId=file_id, media_body=self._media(path), fields="id")
+                return self._execute(request)["id"]
+            except HttpError as e:
+                if e.resp.status != 404:
+                    raise
+                logging.warning(f"⚠️ Drive dosyası {file_id} bulunamadı, yeniden oluşturuluyor")
+        body = {"name": name}
+        if self.folder_id:
+            body["parents"] = [self.folder_id]
+        request = self.service.files().create(body=body, media_body=self._media(path), fields="id")
+        return self._execute(request)["id"]
+
+
+class PyDriveBackend:
+    def __init__(self, drive):
+        self.drive = drive
+
+    def upload(self, path, name, file_id=None):
+        # Bilinen dosya kimliği varsa yeni dosya açmak yerine içerik güncellenir;
+        # pydrive medya gövdesini resumable olarak yükler.
+        if file_id:
+            try:
+                f = self.drive.CreateFile({"id": file_id})
+                f.SetContentFile(path)
+                f.Upload()
+                return f["id"]
+            except Exception as e:
+                logging.warning(f"⚠️ Drive dosyası {file_id} güncellenemedi, yeniden oluşturuluyor: {e}")
+        f = self.drive.CreateFile({"title": name})
+        f.SetContentFile(path)
+        f.Upload()
+        return f["id"]
+
+
+class DriveSync:
+    # Değişen dosyalar işaretlenir; arka plan iş parçacığı her `interval`
+    # saniyede bir hash'i değişenleri toplu olarak yükler. `backend` bir
+    # fabrika da olabilir; kimlik doğrulama ilk yüklemeye kadar ertelenir.
+    def __init__(self, backend, state_file=DRIVE_SYNC_STATE, interval=DRIVE_SYNC_INTERVAL):
+        self._backend = backend if hasattr(backend, "upload") else None
+        self._backend_factory = None if self._backend else backend
+        self.state_file = state_file
+        self.interval = interval
+        self._dirty = set()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread = None
+        self.uploaded = 0
+        self.skipped = 0
+        self.failed = 0
+        self._state = {}
+        if os.path.exists(state_file):
+            with open(state_file) as f:
+                self._state = json.load(f)
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = self._backend_factory()
+        return self._backend
+
+    def reload(self):
+        # Başka bir süreç (önceki lider) yüklediyse dosya kimlikleri diskten okunur
+        with self._flush_lock:
+            if os.path.exists(self.state_file):
+                with open(self.state_file) as f:
+                    self._state = json.load(f)
+
+    def mark_dirty(self, path):
+        with self._lock:
+            self._dirty.add(path)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="drive-sync", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, flush=True):
+        self._stopped = True
+        self._wake.set()
+        if self._thread:
+            self._thread.join()
+        if flush:
+            self.flush()
+
+    def _run(self):
+        while not self._stopped:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            paths, self._dirty = self._dirty, set()
+        if not paths:
+            return
+        try:
+            backend = self.backend
+        except Exception as e:
+            with self._lock:
+                self._dirty |= paths
+            logging.error(f"❌ Drive bağlantısı kurulamadı, {len(paths)} dosya bekletiliyor: {e}")
+            return
+        with self._flush_lock:
+            changed = False
+            for path in sorted(paths):
+                if not os.path.exists(path):
+                    continue
+                digest = file_hash(path)
+                entry = self._state.get(path, {})
+                if entry.get("sha256") == digest:
+                    self.skipped += 1
+                    continue
+                try:
+                    with metrics.timed("drive_upload_seconds"):
+                        file_id = backend.upload(path, os.path.basename(path), entry.get("file_id"))
+                except Exception as e:
+                    self.failed += 1
+                    logging.error(f"❌ {path} GDrive'a yüklenemedi: {e}")
+                    self.mark_dirty(path)
+                    continue
+                self._state[path] = {"sha256": digest, "file_id": file_id}
+                self.uploaded += 1
+                changed = True
+                logging.info(f"☁️ {path} GDrive'a yüklendi")
+            if changed:
+                write_json_atomic(self.state_file, self._state)
+
+    def stats(self):
+        with self._lock:
+            pending = len(self._dirty)
+        return {"pending": pending, "uploaded": self.uploaded, "skipped": self.skipped, "failed": self.failed}
@@ -0,0 +1,123 @@
+import numpy as np
+
+DAY_SECONDS = 86400
+
+
+class FeaturePipeline:
+    # Özellikler bir kez hesaplanıp tamponda tutulur; yeni tick'ler için sadece
+    # son `context` satır bağlam olarak kullanılarak ek satırlar hesaplanır.
+    # history=False (canlı durum): tampon kayan penceredir, yalnızca bağlam için
+    # gereken son satırlar tutulur; tam matris yalnızca geriye dönük testte gerekir.
+    def __init__(self, lags=(1, 6, 36, 144), window=36, capacity=1024, history=True):
+        self.lags = tuple(lags)
+        self.window = window
+        self.history = history
+        self.context = max(max(self.lags), window)
+        self.columns = [f"ret_{lag}" for lag in self.lags] + ["roll_mean", "roll_vol", "tod_sin", "tod_cos"]
+        self.count = 0
+        self._n = 0
+        self._chunk = max(capacity, self.context)
+        self._ts = np.empty(capacity, dtype=np.int64)
+        self._price = np.empty(capacity, dtype=np.float64)
+        self._features = np.empty((capacity, len(self.columns)), dtype=np.float64)
+
+    def _reserve(self, size):
+        capacity = len(self._ts)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        self._ts = np.resize(self._ts, capacity)
+        self._price = np.resize(self._price, capacity)
+        features = np.empty((capacity, len(self.columns)), dtype=np.float64)
+        features[:self._n] = self._features[:self._n]
+        self._features = features
+
+    def _slide(self, k):
+        # Yer açmak için en eski satırlar atılır, son `context` satır başa taşınır
+        if self._n + k <= len(self._ts):
+            return
+        keep = min(self._n, self.context)
+        drop = self._n - keep
+        self._ts[:keep] = self._ts[drop:self._n]
+        self._price[:keep] = self._price[drop:self._n]
+        self._features[:keep] = self._features[drop:self._n]
+        self._n = keep
+
+    def append(self, ts, price):
+        self.extend(np.array([ts], dtype=np.int64), np.array([price], dtype=np.float64))
+
+    def extend(self, ts, prices):
+        ts = np.asarray(ts, dtype=np.int64)
+        prices = np.asarray(prices, dtype=np.float64)
+        if self.history:
+            self._extend(ts, prices)
+            return
+        # Kayan pencerede büyük geçmiş parça parça işlenir; tampon büyümez
+        for i in range(0, len(ts), self._chunk):
+            self._slide(min(len(ts) - i, self._chunk))
+            self._extend(ts[i:i + self._chunk], prices[i:i + self._chunk])
+
+    def _extend(self, ts, prices):
+        k = len(ts)
+        if not k:
+            return
+        ctx = min(self._n, self.context)
+        start = self._n - ctx
+        end = self._n + k
+        self._reserve(end)
+        self._ts[self._n:end] = ts
+        self._price[self._n:end] = prices
+
+        p = self._price[start:end]
+        logp = np.log(p)
+        j = np.arange(ctx, ctx + k)
+        out = np.full((k, len(self.columns)), np.nan)
+
+        for col, lag in enumerate(self.lags):
+            valid = j >= lag
+            out[valid, col] = logp[j[valid]] - logp[j[valid] - lag]
+
+        w = self.window
+        csum = np.concatenate(([0.0], np.cumsum(p)))
+        valid = j + 1 >= w
+        out[valid, len(self.lags)] = (csum[j[valid] + 1] - csum[j[valid] + 1 - w]) / w
+
+        r = np.diff(logp, prepend=logp[0])
+        rsum = np.concatenate(([0.0], np.cumsum(r)))
+        rsum2 = np.concatenate(([0.0], np.cumsum(r * r)))
+        valid = j >= w
+        if w > 1 and valid.any():
+            jv = j[valid]
+            s1 = rsum[jv + 1] - rsum[jv + 1 - w]
+            s2 = rsum2[jv + 1] - rsum2[jv + 1 - w]
+            var = np.maximum(s2 - s1 * s1 / w, 0.0) / (w - 1)
+            out[valid, len(self.lags) + 1] = np.sqrt(var)
+
+        phase = 2 * np.pi * (ts % DAY_SECONDS) / DAY_SECONDS
+        out[:, -2] = np.sin(phase)
+        out[:, -1] = np.cos(phase)
+
+        self._features[self._n:end] = out
+        self._n = end
+        self.count += k
+
+    @property
+    def ts(self):
+        return self._ts[:self._n]
+
+    @property
+    def prices(self):
+        return self._price[:self._n]
+
+    @property
+    def matrix(self):
+        return self._features[:self._n]
+
+    def column(self, name):
+        return self.matrix[:, self.columns.index(name)]
+
+    def latest(self):
+        if not self._n:
+            return {}
+        return dict(zip(self.columns, self._features[self._n - 1].tolist()))
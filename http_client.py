@@ -0,0 +1,106 @@
+import os
+import time
+import random
+import logging
+import requests
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from requests.adapters import HTTPAdapter
+import metrics
+
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "20"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3.05"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "10"))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "2"))
+HTTP_BACKOFF = float(os.getenv("HTTP_BACKOFF", "0.5"))
+HTTP_MAX_BACKOFF = float(os.getenv("HTTP_MAX_BACKOFF", "8"))
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class HttpClient:
+    def __init__(self, pool_size=HTTP_POOL_SIZE, timeout=(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT),
+                 retries=HTTP_RETRIES, backoff=HTTP_BACKOFF, max_backoff=HTTP_MAX_BACKOFF):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="http")
+
+    def _sleep(self, attempt, response=None):
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+        if response is not None and response.headers.get("Retry-After", "").isdigit():
+            delay = max(delay, float(response.headers["Retry-After"]))
+        time.sleep(delay)
+
+    def request(self, method, url, name="http", timeout=None, retries=None, **kwargs):
+        # Bağlantı hataları, zaman aşımları ve RETRY_STATUSES jitter'lı geri çekilmeyle yeniden denenir
+        retries = self.retries if retries is None else retries
+        latency = metrics.histogram(f"http_{name}_seconds")
+        for attempt in range(retries + 1):
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, url, timeout=timeout or self.timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                latency.observe(time.perf_counter() - start)
+                if attempt == retries:
+                    metrics.counter(f"http_{name}_errors_total").inc()
+                    raise
+                metrics.counter(f"http_{name}_retries_total").inc()
+                self._sleep(attempt)
+                continue
+            latency.observe(time.perf_counter() - start)
+            if response.status_code in RETRY_STATUSES and attempt < retries:
+                metrics.counter(f"http_{name}_retries_total").inc()
+                self._sleep(attempt, response)
+                continue
+            if response.status_code >= 400:
+                metrics.counter(f"http_{name}_errors_total").inc()
+            response.raise_for_status()
+            return response
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def _fetch(self, name, url, parse, **kwargs):
+        return parse(self.get(url, name=name, **kwargs))
+
+    def first_valid(self, endpoints, parse, hedged=True, **kwargs):
+        # endpoints: [(ad, url), ...]; parse geçersiz yanıtta hata fırlatmalı.
+        # hedged=True iken tüm uç noktalar yarıştırılır ve ilk geçerli sonuç döner.
+        errors = []
+        if not hedged:
+            for name, url in endpoints:
+                try:
+                    return self._fetch(name, url, parse, **kwargs)
+                except Exception as e:
+                    logging.warning(f"⚠️ API Request hatası ({name}): {e}")
+                    errors.append(e)
+            raise errors[-1] if errors else ValueError("uç nokta yok")
+
+        pending = {
+            self._executor.submit(self._fetch, name, url, parse, **kwargs): name
+            for name, url in endpoints
+        }
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logging.warning(f"⚠️ API Request hatası ({name}): {e}")
+                    errors.append(e)
+                    continue
+                for other in pending:
+                    other.cancel()
+                return result
+        raise errors[-1] if errors else ValueError("uç nokta yok")
+
+
+client = HttpClient()
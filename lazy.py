@@ -0,0 +1,61 @@
+import time
+import logging
+import threading
+
+
+class Subsystem:
+    # İlk get() çağrısında factory çalıştırılır; hata olursa sonraki çağrı yeniden dener
+    def __init__(self, name, factory):
+        self.name = name
+        self.factory = factory
+        self.state = "idle"
+        self.error = None
+        self.init_seconds = None
+        self._value = None
+        self._ready = False
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self):
+        return self._ready
+
+    def get(self):
+        if self._ready:
+            return self._value
+        with self._lock:
+            if not self._ready:
+                self.state = "initializing"
+                start = time.perf_counter()
+                try:
+                    self._value = self.factory()
+                except Exception as e:
+                    self.state = "error"
+                    self.error = str(e)
+                    logging.error(f"❌ {self.name} başlatılamadı: {e}")
+                    raise
+                self.init_seconds = time.perf_counter() - start
+                self.state = "ready"
+                self.error = None
+                self._ready = True
+                logging.info(f"✅ {self.name} hazır ({self.init_seconds:.2f}s)")
+        return self._value
+
+    def status(self):
+        status = {"state": self.state}
+        if self.init_seconds is not None:
+            status["init_seconds"] = round(self.init_seconds, 4)
+        if self.error:
+            status["error"] = self.error
+        return status
+
+
+subsystems = {}
+
+
+def register(name, factory):
+    subsystem = subsystems[name] = Subsystem(name, factory)
+    return subsystem
+
+
+def health():
+    return {name: subsystem.status() for name, subsystem in subsystems.items()}
@@ -0,0 +1,145 @@
+import os
+import time
+import uuid
+import socket
+import sqlite3
+import logging
+import threading
+
+LEADER_DB = os.getenv("LEADER_DB", "leader.db")
+LEADER_TTL = float(os.getenv("LEADER_TTL", "30"))
+LEADER_RENEW = float(os.getenv("LEADER_RENEW", "10"))
+LEADER_NAME = "tick_owner"
+
+
+class LeaderElector:
+    # SQLite tablosunda tek satırlık kira: sahibi her `renew` saniyede süresini
+    # `ttl` kadar uzatır, süresi dolmuş kirayı herhangi bir süreç alabilir. Yazma
+    # işlemleri BEGIN IMMEDIATE ile dosya kilidi altında yapıldığından aynı anda
+    # tek süreç kazanır. Veritabanı tüm işçilerin/replikaların gördüğü paylaşımlı
+    # diskte olmalı (POSIX kilitlerini destekleyen yerel ya da blok disk; NFS değil).
+    # Liderlik yerelde de süreyle sınırlıdır: yenileme takılırsa süreç kira
+    # dolmadan kendini izleyiciye düşürür. `term` her sahip değişiminde artar.
+    def __init__(self, path=LEADER_DB, name=LEADER_NAME, ttl=LEADER_TTL, renew=LEADER_RENEW,
+                 identity=None, on_elected=None, on_demoted=None):
+        self.path = path
+        self.name = name
+        self.ttl = ttl
+        self.renew = renew
+        self.identity = identity or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self.term = None
+        self.owner = None
+        self.elections = 0
+        self.demotions = 0
+        self.failures = 0
+        self._leader = False
+        self._deadline = 0.0
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._conn = None
+
+    @property
+    def is_leader(self):
+        return self._leader and time.monotonic() < self._deadline
+
+    def _connect(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, timeout=self.renew / 2, isolation_level=None,
+                                         check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS lease (name TEXT PRIMARY KEY, owner TEXT NOT NULL, "
+                "expires REAL NOT NULL, term INTEGER NOT NULL)"
+            )
+        return self._conn
+
+    def _acquire(self):
+        # Kira boşsa, süresi dolmuşsa ya da zaten bizdeyse (yenileme) alınır
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT owner, expires, term FROM lease WHERE name = ?", (self.name,)).fetchone()
+            if row is not None and row[0] != self.identity and row[1] > now:
+                conn.execute("COMMIT")
+                self.owner, self.term = row[0], row[2]
+                return False
+            term = row[2] if row is not None and row[0] == self.identity else (row[2] + 1 if row else 1)
+            conn.execute("INSERT OR REPLACE INTO lease (name, owner, expires, term) VALUES (?, ?, ?, ?)",
+                         (self.name, self.identity, now + self.ttl, term))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self.owner, self.term = self.identity, term
+        return True
+
+    def _tick(self):
+        started = time.monotonic()
+        try:
+            acquired = self._acquire()
+        except sqlite3.Error as e:
+            # Yenilenemeyen kira yerel süre dolana kadar geçerli sayılır
+            self.failures += 1
+            logging.warning(f"⚠️ Lider kirası yenilenemedi: {e}")
+            acquired = self.is_leader
+        else:
+            if acquired:
+                self._deadline = started + self.ttl
+        with self._lock:
+            changed = acquired != self._leader
+            self._leader = acquired
+        if not changed:
+            return
+        if acquired:
+            self.elections += 1
+            logging.info(f"👑 Lider seçildi: {self.identity} (dönem {self.term})")
+            if self.on_elected:
+                self.on_elected()
+        else:
+            self.demotions += 1
+            logging.warning(f"⚠️ Liderlik bırakıldı: {self.identity} (sahip {self.owner})")
+            if self.on_demoted:
+                self.on_demoted()
+
+    def start(self):
+        # İlk deneme senkron: süreç rolünü başlangıçta bilir
+        self._tick()
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="leader", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stopped.wait(self.renew):
+            try:
+                self._tick()
+            except Exception as e:
+                logging.error(f"❌ Lider seçimi hatası: {e}")
+
+    def stop(self):
+        # Kira hemen bırakılır; izleyiciler bir sonraki denemede devralır
+        self._stopped.set()
+        if self._thread:
+            self._thread.join()
+        self._thread = None
+        if self._leader:
+            try:
+                self._connect().execute("UPDATE lease SET expires = 0 WHERE name = ? AND owner = ?",
+                                        (self.name, self.identity))
+            except sqlite3.Error as e:
+                logging.warning(f"⚠️ Lider kirası bırakılamadı: {e}")
+            self._leader = False
+
+    def stats(self):
+        return {
+            "identity": self.identity,
+            "leader": self.is_leader,
+            "owner": self.owner,
+            "term": self.term,
+            "elections": self.elections,
+            "demotions": self.demotions,
+            "renew_failures": self.failures,
+        }
@@ -1,108 +1,449 @@
 import os
-import requests
-import pandas as pd
-import pickle
-from flask import Flask
-from apscheduler.schedulers.background import BackgroundScheduler
-from sklearn.linear_model import LinearRegression
+import math
+import time
+import atexit
+import functools
+from datetime import datetime, timedelta
 from dotenv import load_dotenv
-from datetime import datetime
-from pydrive.auth import GoogleAuth
-from pydrive.drive import GoogleDrive
-import logging
 
 load_dotenv()
 
+from flask import Flask, Response, jsonify, request, send_file, abort
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.events import EVENT_JOB_ERROR, EVENT_JOB_MISSED, EVENT_JOB_MAX_INSTANCES
+import logging
+import lazy
+import metrics
+from http_client import client
+from symbols import SymbolRegistry, QuoteFetcher
+from pipeline import Stage
+from drive_sync import DriveSync, LocalDirBackend, GoogleDriveBackend, PyDriveBackend
+import model_artifact
+from model_artifact import LinearArtifact, ArtifactReader
+from telegram_fanout import SubscriberRegistry, FanoutEngine, poll_subscribers, load_offset, save_offset
+from api import ResponseCache, create_api, prediction
+from stream_hub import StreamHub
+from alerts import AlertEngine, parse_command
+from profiler import SamplingProfiler
+from backfill import Backfiller
+from leader import LeaderElector
+
 app = Flask(__name__)
 scheduler = BackgroundScheduler()
-gauth = GoogleAuth()
-gauth.LocalWebserverAuth()
-drive = GoogleDrive(gauth)
 
 FMP_API_KEY = os.getenv("FMP_API_KEY")
 TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
 CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
+FMP_BASE_URL = os.getenv("FMP_BASE_URL", "https://financialmodelingprep.com/api/v3")
+TELEGRAM_BASE_URL = os.getenv("TELEGRAM_BASE_URL", "https://api.telegram.org")
+FMP_HEDGED = os.getenv("FMP_HEDGED", "1") == "1"
 
 DATA_FILE = "data.csv"
-MODEL_FILE = "model.pkl"
+TICK_DIR = os.getenv("TICK_DIR", "ticks")
+MODEL_FILE = "model.bin"
+MIN_TRAIN_ROWS = 10
+PREDICTION_HORIZON = int(os.getenv("PREDICTION_HORIZON", "86400"))
+ONLINE_DECAY = float(os.getenv("ONLINE_DECAY", "1.0"))
+ONLINE_WINDOW = int(os.getenv("ONLINE_WINDOW", "0")) or None
+REFIT_CHECK_EVERY = int(os.getenv("REFIT_CHECK_EVERY", "144"))
+REFIT_TOLERANCE = float(os.getenv("REFIT_TOLERANCE", "1e-6"))
+TRAIN_WORKERS = int(os.getenv("TRAIN_WORKERS", "2"))
+PERSIST_WORKERS = int(os.getenv("PERSIST_WORKERS", "1"))
+NOTIFY_WORKERS = int(os.getenv("NOTIFY_WORKERS", "2"))
+NOTIFY_QUEUE_SIZE = int(os.getenv("NOTIFY_QUEUE_SIZE", "100"))
+DRIVE_BACKEND = os.getenv("DRIVE_BACKEND", "google")
+DRIVE_LOCAL_DIR = os.getenv("DRIVE_LOCAL_DIR", "drive_mirror")
+DRIVE_FOLDER_ID = os.getenv("DRIVE_FOLDER_ID")
+GOOGLE_SERVICE_ACCOUNT_FILE = os.getenv("GOOGLE_SERVICE_ACCOUNT_FILE")
+GOOGLE_TOKEN_FILE = os.getenv("GOOGLE_TOKEN_FILE", "token.json")
+PORT = int(os.getenv("PORT", "8080"))
+DASHBOARD_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "runtime.py")
+TELEGRAM_POLL_SECONDS = int(os.getenv("TELEGRAM_POLL_SECONDS", "30"))
+PROFILE_ENABLED = os.getenv("PROFILE_ENABLED", "0") == "1"
+BACKFILL_ENABLED = os.getenv("BACKFILL_ENABLED", "1") == "1"
+BACKFILL_INTERVAL_HOURS = float(os.getenv("BACKFILL_INTERVAL_HOURS", "6"))
+BACKFILL_START_DELAY = int(os.getenv("BACKFILL_START_DELAY", "30"))
+LEADER_ELECTION = os.getenv("LEADER_ELECTION", "1") == "1"
+FOLLOW_SECONDS = int(os.getenv("FOLLOW_SECONDS", "5"))
+ALERTS_API_TOKEN = os.getenv("ALERTS_API_TOKEN")
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
+registry = SymbolRegistry.from_env()
+NOTIFY_SYMBOLS = set(os.getenv("NOTIFY_SYMBOLS", registry.primary).upper().split(","))
+fetcher = QuoteFetcher(client, FMP_BASE_URL, FMP_API_KEY, hedged=FMP_HEDGED)
+
+def is_leader():
+    return elector is None or elector.is_leader
+
+def load_states():
+    # numpy/pandas ve geçmişin okunması ilk eğitime kadar ertelenir
+    from tick_store import import_csv
+    from state import SymbolState, migrate_flat_store
+
+    # İzleyiciler depoları salt okunur açar; lider olunca promote_states yazılabilir yapar
+    readonly = not is_leader()
+    if not readonly:
+        migrate_flat_store(TICK_DIR, registry.primary)
+    loaded = {
+        symbol: SymbolState.load(TICK_DIR, symbol, decay=ONLINE_DECAY, window=ONLINE_WINDOW, readonly=readonly)
+        for symbol in registry
+    }
+    if not readonly and os.path.exists(DATA_FILE) and len(loaded[registry.primary].store) == 0:
+        import_csv(loaded[registry.primary].store, DATA_FILE)
+        loaded[registry.primary].rebuild()
+    return loaded
+
+def make_drive_backend():
+    if DRIVE_BACKEND == "local":
+        return LocalDirBackend(DRIVE_LOCAL_DIR)
+    if DRIVE_BACKEND == "pydrive":
+        from pydrive.auth import GoogleAuth
+        from pydrive.drive import GoogleDrive
+        gauth = GoogleAuth()
+        gauth.LocalWebserverAuth()
+        return PyDriveBackend(GoogleDrive(gauth))
+    return GoogleDriveBackend.from_credentials(GOOGLE_SERVICE_ACCOUNT_FILE, GOOGLE_TOKEN_FILE, DRIVE_FOLDER_ID)
+
+models = lazy.register("models", load_states)
+drive = lazy.register("drive", make_drive_backend)
+drive_sync = DriveSync(drive.get).start()
+
+subscribers = SubscriberRegistry(seed=[CHAT_ID] if CHAT_ID else [])
+fanout = FanoutEngine(client, TELEGRAM_BASE_URL, TELEGRAM_TOKEN, subscribers)
+
+def get_state(symbol):
+    return models.get()[symbol]
+
+def model_file(symbol):
+    return MODEL_FILE if symbol == registry.primary else f"model_{symbol}.bin"
+
+readers = {symbol: ArtifactReader(model_file(symbol)) for symbol in registry}
+api_cache = ResponseCache()
+hub = StreamHub()
+alerts = AlertEngine()
+backfiller = Backfiller(client, FMP_BASE_URL, FMP_API_KEY)
+app.register_blueprint(create_api(registry, get_state, readers, api_cache, PREDICTION_HORIZON, hub, alerts,
+                                   subscribers, ALERTS_API_TOKEN))
+
+promoted = False
+followed = {}
+
+def promote_states():
+    global promoted
+    if promoted:
+        return
+    for symbol in registry:
+        get_state(symbol).promote()
+    drive_sync.reload()
+    backfiller.reload()
+    promoted = True
+
+def on_elected():
+    # İlk ya da devralınan liderlik: kapalı kalınan aralık kısa süre sonra doldurulur
+    if BACKFILL_ENABLED and scheduler.running:
+        scheduler.modify_job("backfill", next_run_time=datetime.now() + timedelta(seconds=BACKFILL_START_DELAY))
+
+def on_demoted():
+    global promoted
+    promoted = False
+    if models.ready:
+        for state in models.get().values():
+            state.store.close_writer()
+
+# Birden çok işçi/replika: tick'leri yalnızca kira sahibi çeker, eğitir ve gönderir;
+# diğerleri aynı diskteki depo ve model dosyalarından HTTP API'yi sunar
+elector = LeaderElector(on_elected=on_elected, on_demoted=on_demoted) if LEADER_ELECTION else None
+
+def leader_only(fn):
+    # Zamanlanmış işler her işçide tanımlıdır; yalnızca kira sahibinde çalışır
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not is_leader():
+            return None
+        promote_states()
+        return fn(*args, **kwargs)
+    return wrapper
+
+def follow_leader():
+    # İzleyici: liderin yazdığı yeni tick'ler ve model dosyaları bu sürecin
+    # önbelleğine, özet indeksine ve akış istemcilerine yansıtılır
+    if is_leader() or not models.ready:
+        return
+    for symbol, state in models.get().items():
+        ts, prices = state.follow()
+        artifact = readers[symbol].get()
+        if not len(ts) and artifact is followed.get(symbol):
+            continue
+        api_cache.invalidate(symbol)
+        for t, p in zip(ts.tolist(), prices.tolist()):
+            hub.publish("tick", {"symbol": symbol, "timestamp": t, "price": p})
+        if artifact is not followed.get(symbol):
+            followed[symbol] = artifact
+            hub.publish("prediction", prediction(state, readers[symbol], PREDICTION_HORIZON))
+
+@leader_only
+@metrics.timed("tick_fetch_seconds")
 def fetch_data():
-    logging.info("📊 Veri çekimi başlatılıyor...")
-    for endpoint in [
-        f"https://financialmodelingprep.com/api/v3/quote/XAUUSD?apikey={FMP_API_KEY}",
-        f"https://financialmodelingprep.com/api/v3/quote-short/XAUUSD?apikey={FMP_API_KEY}"
-    ]:
-        try:
-            response = requests.get(endpoint)
-            response.raise_for_status()
-            price = response.json()[0]["price"]
-            save_data(price)
+    logging.info(f"📊 Veri çekimi başlatılıyor ({len(registry)} sembol)...")
+    prices = fetcher.fetch(registry)
+    missing = [symbol for symbol in registry if symbol not in prices]
+    if missing:
+        metrics.counter("fetch_missing_symbols_total").inc(len(missing))
+        logging.error(f"❌ {', '.join(missing)} verisi alınamadı")
+    ts = int(time.time())
+    for symbol, price in prices.items():
+        save_data(get_state(symbol), ts, price)
+
+@metrics.timed("tick_save_seconds", (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1))
+def save_data(state, ts, price):
+    # Çekim sürerken liderlik kaybedildiyse yeni liderin deposuna yazılmaz
+    if not is_leader():
+        logging.warning(f"⚠️ {state.symbol} tick'i atlandı: liderlik kaybedildi")
+        return
+    try:
+        state.store.append(ts, price)
+    except ValueError:
+        # Saat kayması (ör. devralmadan sonra) ya da araya giren geçmiş doldurma:
+        # sıra dışı satır geçmişe eklenir, model ve özetler yeniden kurulur
+        logging.warning(f"⚠️ {state.symbol} sıra dışı tick ({ts}) geçmişe ekleniyor")
+        if state.insert_history([ts], [price]):
+            api_cache.invalidate(state.symbol)
+            persist_stage.submit(state.symbol)
+        return
+    state.rollups.update(ts, price)
+    api_cache.invalidate(state.symbol)
+    hub.publish("tick", {"symbol": state.symbol, "timestamp": ts, "price": price})
+    logging.info(f"✅ {state.symbol} verisi dosyaya kaydedildi")
+    check_alerts(state.symbol, ts, price)
+    train_stage.submit(state.symbol)
+
+@metrics.timed("alerts_evaluate_seconds", (0.00001, 0.0001, 0.001, 0.01, 0.1, 1.0))
+def check_alerts(symbol, ts, price):
+    for rule, message in alerts.evaluate(symbol, price, ts):
+        logging.info(f"🔔 Alarm tetiklendi: {rule.describe()} ({rule.chat_id})")
+        fanout.broadcast(message, chat_ids=[rule.chat_id])
+
+@leader_only
+def backfill_gaps():
+    # Kapalı kalınan sürelerin tick'leri toplu eklenir; model ve özellikler
+    # SymbolState.insert_history içinde yeniden kurulur
+    for symbol in registry:
+        state = get_state(symbol)
+        if backfiller.run(state):
+            api_cache.invalidate(symbol)
+            persist_stage.submit(symbol)
+
+def train_model(symbol):
+    # Eğitim geride kalırsa bekleyen işler birleşir; depoda henüz işlenmemiş
+    # tüm satırlar tek seferde okunduğu için hiçbir tick kaybolmaz.
+    state = get_state(symbol)
+    with state.lock:
+        ts, prices = state.store.read(state.trained)
+        if not len(ts):
             return
-        except Exception as e:
-            logging.warning(f"⚠️ API Request hatası: {e}")
-    logging.error("❌ XAU/USD verisi alınamadı, veri çekimi iptal edildi")
-
-def save_data(price):
-    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    new_data = pd.DataFrame([[now, price]], columns=["timestamp", "price"])
-    if os.path.exists(DATA_FILE):
-        df = pd.read_csv(DATA_FILE)
-        df = pd.concat([df, new_data], ignore_index=True)
-    else:
-        df = new_data
-    df.to_csv(DATA_FILE, index=False)
-    logging.info("✅ Veri dosyaya kaydedildi")
-    if len(df) >= 10:
-        train_model(df)
-
-def train_model(df):
-    logging.info("🤖 Model eğitimi başlatılıyor...")
-    df["timestamp"] = pd.to_datetime(df["timestamp"])
-    df["timestamp_ordinal"] = df["timestamp"].map(datetime.toordinal)
-    X = df["timestamp_ordinal"].values.reshape(-1, 1)
-    y = df["price"].values
-    model = LinearRegression().fit(X, y)
-    with open(MODEL_FILE, "wb") as f:
-        pickle.dump(model, f)
-    logging.info("✅ Model eğitimi tamamlandı")
-    upload_to_drive(MODEL_FILE)
-    send_prediction(df, model)
-
-def send_prediction(df, model):
-    future_time = datetime.now().toordinal() + 1
-    predicted_price = model.predict([[future_time]])[0]
-    current_price = df.iloc[-1]["price"]
+        logging.info(f"🤖 {symbol} model eğitimi başlatılıyor ({len(ts)} yeni satır)...")
+        checks_before = state.model.seen // REFIT_CHECK_EVERY
+        for t, p in zip(ts.tolist(), prices.tolist()):
+            state.model.update(t, p)
+        state.features.extend(ts, prices)
+        state.trained += len(ts)
+        if state.model.seen // REFIT_CHECK_EVERY != checks_before:
+            verify_model(state)
+        if state.model.seen < MIN_TRAIN_ROWS:
+            return
+        logging.info("✅ Model eğitimi tamamlandı")
+    persist_stage.submit(symbol)
+
+def persist_model(symbol):
+    state = get_state(symbol)
+    with state.lock:
+        artifact = LinearArtifact.from_model(state.model, symbol=symbol)
+    filename = model_file(symbol)
+    model_artifact.save(filename, artifact)
+    api_cache.invalidate(symbol)
+    hub.publish("prediction", prediction(state, readers[symbol], PREDICTION_HORIZON))
+    drive_sync.mark_dirty(filename)
+    if symbol in NOTIFY_SYMBOLS:
+        message = build_prediction(state)
+        if message:
+            notify_stage.submit(message)
+
+def verify_model(state):
+    # Periyodik tam fit: online toplamlar kayarsa geçmişten yeniden kur
+    from online_model import check_against_batch
+
+    ts, prices = state.store.read(0, state.trained)
+    ok, online_pred, batch_pred = check_against_batch(state.model, ts, prices, REFIT_TOLERANCE)
+    if ok:
+        logging.info(f"✅ {state.symbol} online model toplu fit ile uyumlu")
+        return
+    logging.warning(f"⚠️ {state.symbol} online model sapması: online={online_pred:.4f} toplu={batch_pred:.4f}, yeniden kuruluyor")
+    state.model.fit_arrays(ts, prices)
+
+def build_prediction(state):
+    # Tahmin bellekteki modelden değil, diskteki artefakttan okunur
+    artifact = readers[state.symbol].get()
+    if artifact is None or state.store.last is None:
+        return None
+    current_price = state.store.last[1]
+    future_time = int(time.time()) + PREDICTION_HORIZON
+    predicted_price = artifact.predict(future_time)
     diff = predicted_price - current_price
+    with state.lock:
+        volatility = state.features.latest().get("roll_vol", float("nan"))
     message = (
+        f"🪙 {state.symbol}\n"
         f"📈 Tahmin: {predicted_price:.2f} USD\n"
         f"💰 Şu anki fiyat: {current_price:.2f} USD\n"
-        f"{'📉 DÜŞÜŞ' if diff < 0 else '📈 YÜKSELİŞ'} bekleniyor!"
     )
-    send_telegram(message)
+    if not math.isnan(volatility):
+        message += f"📊 Oynaklık (6s): %{volatility * 100:.3f}\n"
+    message += f"{'📉 DÜŞÜŞ' if diff < 0 else '📈 YÜKSELİŞ'} bekleniyor!"
+    return message
 
 def send_telegram(msg):
-    url = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage"
-    payload = {"chat_id": CHAT_ID, "text": msg}
+    job = fanout.broadcast(msg)
+    if job:
+        logging.info(f"📤 Telegram mesajı {job.total} aboneye kuyruğa alındı")
+
+def handle_command(chat_id, text):
+    # /alert above|below|change <değer> [SEMBOL], /alerts, /unalert <id>
+    command = text.split()[0].lower()
+    if command == "/alert":
+        try:
+            kind, value, symbol = parse_command(text, registry.primary)
+            if symbol not in registry:
+                raise ValueError(f"bilinmeyen sembol: {symbol}")
+            last = get_state(symbol).store.last
+            rule = alerts.add(chat_id, symbol, kind, value, price=last[1] if last else None)
+            reply = f"✅ Alarm eklendi: {rule.describe()}"
+        except ValueError as e:
+            reply = f"⚠️ {e}"
+    elif command == "/alerts":
+        rules = alerts.for_chat(chat_id)
+        reply = "\n".join(rule.describe() for rule in rules) if rules else "Kayıtlı alarm yok"
+    elif command == "/unalert":
+        parts = text.split()
+        removed = len(parts) > 1 and parts[1].lstrip("#").isdigit() and alerts.remove(int(parts[1].lstrip("#")), chat_id)
+        reply = "🗑️ Alarm silindi" if removed else "⚠️ kullanım: /unalert <id>"
+    else:
+        return
+    fanout.broadcast(reply, chat_ids=[chat_id], dedup=False)
+
+@leader_only
+def poll_telegram():
+    # Offset her turda paylaşılan dosyadan okunur: lider değişince yeni lider kaldığı yerden devam eder
+    offset = load_offset()
     try:
-        requests.post(url, data=payload)
-        logging.info("📤 Telegram mesajı gönderildi")
+        new_offset = poll_subscribers(client, TELEGRAM_BASE_URL, TELEGRAM_TOKEN, subscribers, offset,
+                                      on_command=handle_command)
     except Exception as e:
-        logging.error(f"Telegram hatası: {e}")
+        logging.warning(f"⚠️ Telegram güncellemeleri alınamadı: {e}")
+        return
+    if new_offset != offset:
+        save_offset(new_offset)
+
+train_stage = Stage("train", train_model, workers=TRAIN_WORKERS, maxsize=len(registry), key=lambda symbol: symbol).start()
+persist_stage = Stage("persist", persist_model, workers=PERSIST_WORKERS, maxsize=len(registry), key=lambda symbol: symbol).start()
+notify_stage = Stage("notify", send_telegram, workers=NOTIFY_WORKERS, maxsize=NOTIFY_QUEUE_SIZE, put_timeout=0.1).start()
+stages = [train_stage, persist_stage, notify_stage]
+profiler = SamplingProfiler().start() if PROFILE_ENABLED else None
+
+# Var olan sayaç alanları kazıma anında okunur; sıcak yola ek maliyet yok
+for stage in stages:
+    metrics.gauge(f"stage_{stage.name}_depth", lambda stage=stage: stage.depth)
+    for field in ("processed", "coalesced", "dropped", "errors"):
+        metrics.counter(f"stage_{stage.name}_{field}_total", lambda stage=stage, field=field: getattr(stage, field))
+for field in ("sent", "failed", "retried", "duplicates"):
+    metrics.counter(f"telegram_{field}_total", lambda field=field: getattr(fanout, field))
+for field in ("uploaded", "skipped", "failed"):
+    metrics.counter(f"drive_{field}_total", lambda field=field: getattr(drive_sync, field))
+metrics.gauge("drive_pending_files", lambda: drive_sync.stats()["pending"])
+metrics.gauge("telegram_subscribers", lambda: len(subscribers))
+metrics.gauge("stream_clients", lambda: hub.stats()["clients"])
+metrics.counter("stream_dropped_total", lambda: hub.dropped)
+metrics.gauge("alert_rules", lambda: len(alerts.rules))
+metrics.counter("alerts_fired_total", lambda: alerts.fired)
+for field in ("fetched", "resumed", "failed", "inserted"):
+    metrics.counter(f"backfill_{field}_total", lambda field=field: getattr(backfiller, field))
+if elector:
+    metrics.gauge("leader_is_leader", lambda: int(elector.is_leader))
+    for field in ("elections", "demotions", "failures"):
+        metrics.counter(f"leader_{field}_total", lambda field=field: getattr(elector, field))
+metrics.counter("api_cache_hits_total", lambda: api_cache.hits)
+metrics.counter("api_cache_misses_total", lambda: api_cache.misses)
+metrics.counter("api_cache_evicted_total", lambda: api_cache.evicted)
+
+def on_job_event(event):
+    # max_instances dolu (önceki çalıştırma sürüyor) ya da misfire süresi aşıldı
+    if event.code == EVENT_JOB_ERROR:
+        metrics.counter(f"scheduler_{event.job_id}_errors_total").inc()
+        return
+    metrics.counter(f"scheduler_{event.job_id}_skipped_total").inc()
+    logging.warning(f"⚠️ {event.job_id} zamanlanmış çalıştırması atlandı")
 
-def upload_to_drive(filename):
-    f = drive.CreateFile({"title": filename})
-    f.SetContentFile(filename)
-    f.Upload()
-    logging.info(f"☁️ {filename} GDrive'a yüklendi")
+scheduler.add_listener(on_job_event, EVENT_JOB_ERROR | EVENT_JOB_MISSED | EVENT_JOB_MAX_INSTANCES)
 
 @app.route("/")
 def home():
     return "Bot Aktif"
 
-scheduler.add_job(fetch_data, "interval", minutes=10)
+@app.route("/dashboard")
+def dashboard():
+    return send_file(DASHBOARD_FILE, mimetype="text/html")
+
+@app.route("/health")
+def health():
+    subsystems = lazy.health()
+    subsystems["scheduler"] = {"state": "ready" if scheduler.running else "idle"}
+    subsystems["scheduler"]["role"] = "leader" if is_leader() else "follower"
+    # HTTP katmanı ayakta olduğu sürece 200; alt sistem hataları gövdede raporlanır
+    failed = any(status["state"] == "error" for status in subsystems.values())
+    return jsonify({"status": "degraded" if failed else "ok", "subsystems": subsystems})
+
+@app.route("/metrics")
+def metrics_endpoint():
+    return Response(metrics.render_prometheus(), mimetype="text/plain; version=0.0.4")
+
+@app.route("/metrics/profile")
+def profile_endpoint():
+    # Katlanmış yığınlar: flamegraph.pl ya da speedscope ile görselleştirilebilir
+    if profiler is None:
+        abort(404, "profil kapalı: PROFILE_ENABLED=1 ile başlatın")
+    limit = request.args.get("limit", type=int)
+    body = profiler.collapsed(limit)
+    if request.args.get("reset") == "1":
+        profiler.reset()
+    return Response(body, mimetype="text/plain")
+
+@app.route("/pipeline")
+def pipeline_stats():
+    stats = {stage.name: stage.stats() for stage in stages}
+    stats["drive_sync"] = drive_sync.stats()
+    stats["telegram"] = fanout.stats()
+    stats["api_cache"] = api_cache.stats()
+    stats["stream"] = hub.stats()
+    stats["alerts"] = alerts.stats()
+    stats["backfill"] = backfiller.stats()
+    if elector:
+        stats["leader"] = elector.stats()
+    return jsonify(stats)
+
+scheduler.add_job(fetch_data, "interval", minutes=10, id="fetch_data")
+if TELEGRAM_TOKEN:
+    scheduler.add_job(poll_telegram, "interval", seconds=TELEGRAM_POLL_SECONDS, id="poll_telegram")
+if BACKFILL_ENABLED:
+    # İlk çalıştırma açılıştan kısa süre sonra, ardından düzenli aralıklarla
+    scheduler.add_job(backfill_gaps, "interval", hours=BACKFILL_INTERVAL_HOURS, id="backfill",
+                      next_run_time=datetime.now() + timedelta(seconds=BACKFILL_START_DELAY))
+if elector:
+    scheduler.add_job(follow_leader, "interval", seconds=FOLLOW_SECONDS, id="follow_leader")
 scheduler.start()
+if elector:
+    elector.start()
+    # Düzgün kapanışta kira hemen bırakılır; aksi halde LEADER_TTL sonunda devralınır
+    atexit.register(elector.stop)
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=8080)
+    app.run(host="0.0.0.0", port=PORT)
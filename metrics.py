@@ -0,0 +1,180 @@
+import re
+import time
+import bisect
+import functools
+import threading
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+    def quantile(self, q):
+        # Kova sınırlarından yaklaşık değer; tam değer için ham örnek tutulmaz
+        with self._lock:
+            counts = list(self.counts)
+            total = self.count
+        if not total:
+            return 0.0
+        rank = q * total
+        seen = 0
+        for index, count in enumerate(counts):
+            seen += count
+            if seen >= rank:
+                return self.buckets[index] if index < len(self.buckets) else float("inf")
+        return float("inf")
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "count": self.count,
+                "sum": self.sum,
+                "buckets": dict(zip(self.buckets + (float("inf"),), self.counts)),
+            }
+
+
+class Counter:
+    # Değer ya inc() ile artırılır ya da her okumada `fn` çağrılarak hesaplanır;
+    # ikinci yol mevcut sayaç alanlarını sıcak yola maliyet eklemeden dışa açar.
+    def __init__(self, fn=None):
+        self.fn = fn
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self):
+        return self.fn() if self.fn else self._value
+
+
+class Gauge:
+    def __init__(self, fn=None):
+        self.fn = fn
+        self._value = 0.0
+
+    def set(self, value):
+        self._value = value
+
+    @property
+    def value(self):
+        return self.fn() if self.fn else self._value
+
+
+class timed:
+    # Hem bağlam yöneticisi (`with timed("x_seconds"):`) hem dekoratör (`@timed("x_seconds")`)
+    def __init__(self, name, buckets=DEFAULT_BUCKETS):
+        self.histogram = histogram(name, buckets)
+        self._local = threading.local()
+
+    def __enter__(self):
+        starts = getattr(self._local, "starts", None)
+        if starts is None:
+            starts = self._local.starts = []
+        starts.append(time.perf_counter())
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self._local.starts.pop())
+        return False
+
+    def __call__(self, fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.histogram.observe(time.perf_counter() - start)
+        return wrapper
+
+
+_histograms = {}
+_counters = {}
+_gauges = {}
+_registry_lock = threading.Lock()
+
+
+def histogram(name, buckets=DEFAULT_BUCKETS):
+    with _registry_lock:
+        hist = _histograms.get(name)
+        if hist is None:
+            hist = _histograms[name] = Histogram(buckets)
+        return hist
+
+
+def histograms():
+    with _registry_lock:
+        return dict(_histograms)
+
+
+def counter(name, fn=None):
+    with _registry_lock:
+        c = _counters.get(name)
+        if c is None:
+            c = _counters[name] = Counter(fn)
+        elif fn is not None:
+            c.fn = fn
+        return c
+
+
+def gauge(name, fn=None):
+    with _registry_lock:
+        g = _gauges.get(name)
+        if g is None:
+            g = _gauges[name] = Gauge(fn)
+        elif fn is not None:
+            g.fn = fn
+        return g
+
+
+def _metric_name(name):
+    return re.sub(r"[^a-zA-Z0-9_:]", "_", name)
+
+
+def _format(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_prometheus():
+    # Prometheus metin biçimi (0.0.4); histogram kovaları kümülatif yazılır
+    with _registry_lock:
+        hists = sorted(_histograms.items())
+        counters = sorted(_counters.items())
+        gauges = sorted(_gauges.items())
+    lines = []
+    for kind, items in (("counter", counters), ("gauge", gauges)):
+        for name, metric in items:
+            name = _metric_name(name)
+            try:
+                value = metric.value
+            except Exception:
+                continue
+            lines += [f"# TYPE {name} {kind}", f"{name} {_format(value)}"]
+    for name, hist in hists:
+        name = _metric_name(name)
+        snap = hist.snapshot()
+        lines.append(f"# TYPE {name} histogram")
+        total = 0
+        for bound, count in snap["buckets"].items():
+            total += count
+            lines.append(f'{name}_bucket{{le="{_format(bound)}"}} {total}')
+        lines += [f"{name}_sum {_format(snap['sum'])}", f"{name}_count {snap['count']}"]
+    return "\n".join(lines) + "\n"
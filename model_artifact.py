@@ -0,0 +1,113 @@
+import os
+import json
+import time
+import struct
+import logging
+import threading
+
+# Dosya düzeni: başlık | n_coef adet float64 | meta_len byte JSON meta
+MAGIC = b"XAUM"
+FORMAT_VERSION = 1
+KIND_LINEAR = 1
+HEADER = struct.Struct("<4sHHII")
+MODEL_HISTORY_DIR = os.getenv("MODEL_HISTORY_DIR", "model_history")
+MODEL_HISTORY_KEEP = int(os.getenv("MODEL_HISTORY_KEEP", "5"))
+
+
+class LinearArtifact:
+    # y = intercept + slope * (x - x0)
+    def __init__(self, x0, intercept, slope, meta=None):
+        self.x0 = x0
+        self.intercept = intercept
+        self.slope = slope
+        self.meta = meta or {}
+
+    @classmethod
+    def from_model(cls, model, **meta):
+        slope, intercept = model._centered()
+        meta.setdefault("n_samples", model.seen)
+        meta.setdefault("decay", model.decay)
+        meta.setdefault("window", model.window)
+        meta.setdefault("trained_at", int(time.time()))
+        return cls(model.x0 or 0.0, intercept, slope, meta)
+
+    @property
+    def version(self):
+        return self.meta.get("n_samples", 0)
+
+    def predict(self, x):
+        return self.intercept + self.slope * (float(x) - self.x0)
+
+
+def dumps(artifact):
+    coef = (artifact.x0, artifact.intercept, artifact.slope)
+    meta = json.dumps(artifact.meta, separators=(",", ":")).encode()
+    return (
+        HEADER.pack(MAGIC, FORMAT_VERSION, KIND_LINEAR, len(coef), len(meta))
+        + struct.pack(f"<{len(coef)}d", *coef)
+        + meta
+    )
+
+
+def loads(data):
+    magic, version, kind, n_coef, meta_len = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("model dosyası değil")
+    if version != FORMAT_VERSION or kind != KIND_LINEAR:
+        raise ValueError(f"desteklenmeyen model sürümü: {version}/{kind}")
+    offset = HEADER.size
+    coef = struct.unpack_from(f"<{n_coef}d", data, offset)
+    offset += 8 * n_coef
+    meta = json.loads(data[offset:offset + meta_len]) if meta_len else {}
+    return LinearArtifact(coef[0], coef[1], coef[2], meta)
+
+
+def load(path):
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+def save(path, artifact, history_dir=MODEL_HISTORY_DIR, keep=MODEL_HISTORY_KEEP):
+    data = dumps(artifact)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    if keep:
+        _keep_history(path, data, artifact.version, history_dir, keep)
+
+
+def _keep_history(path, data, version, history_dir, keep):
+    os.makedirs(history_dir, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    with open(os.path.join(history_dir, f"{stem}-{version:010d}.bin"), "wb") as f:
+        f.write(data)
+    versions = sorted(name for name in os.listdir(history_dir) if name.startswith(f"{stem}-"))
+    for name in versions[:-keep]:
+        os.remove(os.path.join(history_dir, name))
+
+
+class ArtifactReader:
+    # Dosya değiştiğinde (mtime/inode/boyut) yeniden okur; aksi halde önbellekten döner
+    def __init__(self, path):
+        self.path = path
+        self._sig = None
+        self._artifact = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        sig = (st.st_mtime_ns, st.st_ino, st.st_size)
+        with self._lock:
+            if sig != self._sig:
+                try:
+                    self._artifact = load(self.path)
+                    self._sig = sig
+                except (OSError, ValueError, struct.error) as e:
+                    logging.warning(f"⚠️ {self.path} okunamadı: {e}")
+            return self._artifact
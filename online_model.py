@@ -0,0 +1,119 @@
+from collections import deque
+import numpy as np
+
+
+class OnlineLinearRegression:
+    # Σx, Σy, Σxy, Σx² ve sayaç tutulur; her yeni fiyat O(1) maliyetle eklenir.
+    # x değerleri sayısal kararlılık için ilk gözlemden (x0) itibaren kaydırılır.
+    def __init__(self, decay=1.0, window=None):
+        self.decay = decay
+        self.window = window
+        self.x0 = None
+        self.reset()
+
+    def reset(self):
+        self.n = 0.0
+        self.sx = 0.0
+        self.sy = 0.0
+        self.sxy = 0.0
+        self.sxx = 0.0
+        self.seen = 0
+        self._points = deque()
+
+    def _add(self, dx, y, w):
+        self.n += w
+        self.sx += w * dx
+        self.sy += w * y
+        self.sxy += w * dx * y
+        self.sxx += w * dx * dx
+
+    def update(self, x, y):
+        if self.x0 is None:
+            self.x0 = float(x)
+        dx = float(x) - self.x0
+        y = float(y)
+        if self.decay != 1.0:
+            self.n *= self.decay
+            self.sx *= self.decay
+            self.sy *= self.decay
+            self.sxy *= self.decay
+            self.sxx *= self.decay
+        self._add(dx, y, 1.0)
+        if self.window:
+            self._points.append((dx, y))
+            if len(self._points) > self.window:
+                old_dx, old_y = self._points.popleft()
+                self._add(old_dx, old_y, -(self.decay ** self.window))
+        self.seen += 1
+
+    def fit_arrays(self, x, y):
+        # Geçmişten toplu başlatma: update() ile aynı toplamları vektörel hesaplar
+        self.reset()
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        self.seen = len(x)
+        if not len(x):
+            return self
+        if self.x0 is None:
+            self.x0 = float(x[0])
+        if self.window:
+            x, y = x[-self.window:], y[-self.window:]
+        dx = x - self.x0
+        w = self.decay ** np.arange(len(x) - 1, -1, -1, dtype=np.float64)
+        self.n = float(w.sum())
+        self.sx = float(np.dot(w, dx))
+        self.sy = float(np.dot(w, y))
+        self.sxy = float(np.dot(w, dx * y))
+        self.sxx = float(np.dot(w, dx * dx))
+        if self.window:
+            self._points.extend(zip(dx.tolist(), y.tolist()))
+        return self
+
+    def _centered(self):
+        if self.n <= 0:
+            return 0.0, 0.0
+        denom = self.n * self.sxx - self.sx * self.sx
+        if denom <= 1e-12 * max(self.n * self.sxx, 1.0):
+            slope = 0.0
+        else:
+            slope = (self.n * self.sxy - self.sx * self.sy) / denom
+        return slope, (self.sy - slope * self.sx) / self.n
+
+    @property
+    def coef_(self):
+        return self._centered()[0]
+
+    @property
+    def intercept_(self):
+        slope, intercept = self._centered()
+        return intercept - slope * (self.x0 or 0.0)
+
+    def predict(self, x):
+        slope, intercept = self._centered()
+        return intercept + slope * (float(x) - (self.x0 or 0.0))
+
+
+def batch_fit(x, y, decay=1.0, window=None):
+    from sklearn.linear_model import LinearRegression
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if window:
+        x, y = x[-window:], y[-window:]
+    w = decay ** np.arange(len(x) - 1, -1, -1, dtype=np.float64)
+    return LinearRegression().fit(x.reshape(-1, 1), y, sample_weight=w)
+
+
+def check_against_batch(model, x, y, tolerance=1e-6):
+    # Online ve toplu fit aynı noktada aynı tahmini ve eğimi vermeli
+    batch = batch_fit(x, y, model.decay, model.window)
+    at = float(x[-1])
+    online_pred = model.predict(at)
+    batch_pred = float(batch.predict([[at]])[0])
+    scale = max(abs(batch_pred), 1.0)
+    slope_scale = max(abs(batch.coef_[0]), 1e-12)
+    ok = bool(
+        abs(online_pred - batch_pred) <= tolerance * scale
+        and abs(model.coef_ - batch.coef_[0]) <= tolerance * slope_scale + 1e-12
+    )
+    return ok, online_pred, batch_pred
@@ -0,0 +1,125 @@
+import time
+import logging
+import threading
+from collections import OrderedDict, deque
+import metrics
+
+
+class Stage:
+    # Sınırlı kuyruklu işçi havuzu. `key` verilirse aynı anahtarlı bekleyen iş
+    # en yenisiyle değiştirilir (birleştirme) ve aynı anahtar aynı anda iki
+    # işçide çalışmaz. Kuyruk doluysa üretici en fazla `put_timeout` bekler,
+    # sonra iş düşürülür; zamanlanmış görev hiçbir zaman takılmaz.
+    def __init__(self, name, handler, workers=1, maxsize=100, key=None, put_timeout=0.0):
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.maxsize = maxsize
+        self.key = key
+        self.put_timeout = put_timeout
+        self._items = OrderedDict() if key else deque()
+        self._active = set()
+        self._cond = threading.Condition()
+        self._threads = []
+        self._stopped = False
+        self.processed = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.errors = 0
+        self.latency = metrics.histogram(f"stage_{name}_seconds")
+        self.wait_time = metrics.histogram(f"stage_{name}_wait_seconds")
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"{self.name}-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self, timeout=None):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    @property
+    def depth(self):
+        with self._cond:
+            return len(self._items)
+
+    def submit(self, item):
+        now = time.monotonic()
+        with self._cond:
+            if self.key:
+                k = self.key(item)
+                if k in self._items:
+                    self._items[k] = (item, self._items[k][1])
+                    self.coalesced += 1
+                    return True
+            deadline = now + self.put_timeout
+            while len(self._items) >= self.maxsize:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._cond.wait(remaining):
+                    if len(self._items) < self.maxsize:
+                        break
+                    self.dropped += 1
+                    logging.warning(f"⚠️ {self.name} kuyruğu dolu, iş düşürüldü")
+                    return False
+            if self.key:
+                self._items[k] = (item, now)
+            else:
+                self._items.append((item, now))
+            self._cond.notify_all()
+            return True
+
+    def _take(self):
+        if not self.key:
+            return None, self._items.popleft()
+        for k in self._items:
+            if k not in self._active:
+                self._active.add(k)
+                return k, self._items.pop(k)
+        return None, None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                k, entry = None, None
+                while not self._stopped:
+                    if self._items:
+                        k, entry = self._take()
+                        if entry is not None:
+                            break
+                    self._cond.wait()
+                if entry is None:
+                    return
+                self._cond.notify_all()
+            item, enqueued = entry
+            start = time.monotonic()
+            self.wait_time.observe(start - enqueued)
+            try:
+                self.handler(item)
+            except Exception as e:
+                self.errors += 1
+                logging.exception(f"❌ {self.name} aşaması hatası: {e}")
+            finally:
+                self.latency.observe(time.monotonic() - start)
+                with self._cond:
+                    self.processed += 1
+                    if k is not None:
+                        self._active.discard(k)
+                        self._cond.notify_all()
+
+    def stats(self):
+        return {
+            "depth": self.depth,
+            "workers": self.workers,
+            "processed": self.processed,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "latency_p50": self.latency.quantile(0.5),
+            "latency_p95": self.latency.quantile(0.95),
+            "wait_p95": self.wait_time.quantile(0.95),
+        }
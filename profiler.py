@@ -0,0 +1,83 @@
+import os
+import sys
+import time
+import logging
+import threading
+from collections import Counter
+
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", "0.01"))
+PROFILE_MAX_DEPTH = int(os.getenv("PROFILE_MAX_DEPTH", "64"))
+# Kuyruk/kilit/soket beklemesindeki iş parçacıkları varsayılan olarak sayılmaz
+IDLE_FRAMES = {"threading.py:wait", "queue.py:get", "selectors.py:select", "socket.py:accept", "threading.py:_wait_for_tstate_lock"}
+
+
+class SamplingProfiler:
+    # İsteğe bağlı örnekleyici: her `interval` saniyede sys._current_frames() ile
+    # tüm iş parçacıklarının yığınını okur ve "katlanmış yığın" sayaçlarında toplar
+    # (flamegraph.pl / speedscope biçimi). İzleme kancası kurmadığı için ölçülen
+    # koda ek yük getirmez; maliyet yalnızca örnekleme iş parçacığındadır.
+    def __init__(self, interval=PROFILE_INTERVAL, max_depth=PROFILE_MAX_DEPTH, include_idle=False):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.include_idle = include_idle
+        self.samples = Counter()
+        self.taken = 0
+        self.started = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return self
+        self._stopped.clear()
+        self.started = time.time()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+        logging.info(f"🔬 Örnekleyici profil başlatıldı ({self.interval * 1000:.0f} ms)")
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread:
+            self._thread.join()
+        self._thread = None
+
+    def _stack(self, frame):
+        code = frame.f_code
+        if not self.include_idle and f"{os.path.basename(code.co_filename)}:{code.co_name}" in IDLE_FRAMES:
+            return None
+        parts = []
+        while frame is not None and len(parts) < self.max_depth:
+            code = frame.f_code
+            parts.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+            frame = frame.f_back
+        return ";".join(reversed(parts))
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stopped.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            stacks = []
+            for ident, frame in sys._current_frames().items():
+                stack = self._stack(frame) if ident != own else None
+                if stack:
+                    stacks.append(f"{names.get(ident, ident)};{stack}")
+            with self._lock:
+                self.samples.update(stacks)
+                self.taken += 1
+
+    def collapsed(self, limit=None):
+        with self._lock:
+            items = self.samples.most_common(limit)
+        return "".join(f"{stack} {count}\n" for stack, count in items)
+
+    def reset(self):
+        with self._lock:
+            self.samples.clear()
+            self.taken = 0
+            self.started = time.time()
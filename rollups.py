@@ -0,0 +1,135 @@
+import threading
+import numpy as np
+
+RESOLUTIONS = {"1h": 3600, "1d": 86400, "1w": 604800}
+# 1970-01-01 perşembe; haftalık kovalar pazartesi 00:00 UTC'de başlar
+OFFSETS = {"1w": 3 * 86400}
+
+
+class Rollup:
+    # Kova başlangıçları artan sırada tutulur; sıradaki tick ya son kovayı
+    # günceller ya da yeni kova ekler (amortize O(1)). Aralık sorgusu ikili arama.
+    def __init__(self, step, offset=0, capacity=256):
+        self.step = step
+        self.offset = offset
+        self.n = 0
+        self.start = np.empty(capacity, dtype=np.int64)
+        self.ohlc = np.empty((capacity, 4), dtype=np.float64)
+        self.count = np.empty(capacity, dtype=np.int64)
+        self._lock = threading.Lock()
+
+    def bucket(self, ts):
+        return (ts + self.offset) // self.step * self.step - self.offset
+
+    def _reserve(self, size):
+        if size <= len(self.start):
+            return
+        capacity = max(size, 2 * len(self.start))
+        self.start = np.resize(self.start, capacity)
+        self.ohlc = np.resize(self.ohlc, (capacity, 4))
+        self.count = np.resize(self.count, capacity)
+
+    def update(self, ts, price):
+        with self._lock:
+            self._update(int(ts), float(price))
+
+    def _update(self, ts, price):
+        bucket = self.bucket(ts)
+        if self.n and bucket <= self.start[self.n - 1]:
+            i = self.n - 1 if bucket == self.start[self.n - 1] else int(np.searchsorted(self.start[:self.n], bucket))
+            if self.start[i] == bucket:
+                row = self.ohlc[i]
+                row[1] = max(row[1], price)
+                row[2] = min(row[2], price)
+                if i == self.n - 1:
+                    row[3] = price
+                self.count[i] += 1
+                return
+            # Sıra dışı gelen ve kovası olmayan tick: araya yeni kova ekle
+            self._reserve(self.n + 1)
+            self.start[i + 1:self.n + 1] = self.start[i:self.n].copy()
+            self.ohlc[i + 1:self.n + 1] = self.ohlc[i:self.n].copy()
+            self.count[i + 1:self.n + 1] = self.count[i:self.n].copy()
+        else:
+            i = self.n
+            self._reserve(self.n + 1)
+        self.start[i] = bucket
+        self.ohlc[i] = (price, price, price, price)
+        self.count[i] = 1
+        self.n += 1
+
+    def extend(self, ts, prices):
+        # Sıralı toplu giriş (başlangıçta geçmişten kurulum): reduceat ile vektörel
+        ts = np.asarray(ts, dtype=np.int64)
+        prices = np.asarray(prices, dtype=np.float64)
+        if not len(ts):
+            return
+        buckets = self.bucket(ts)
+        with self._lock:
+            if self.n and buckets[0] <= self.start[self.n - 1]:
+                k = int(np.searchsorted(buckets, self.start[self.n - 1], side="right"))
+                for t, p in zip(ts[:k].tolist(), prices[:k].tolist()):
+                    self._update(t, p)
+                ts, prices, buckets = ts[k:], prices[k:], buckets[k:]
+                if not len(ts):
+                    return
+            starts = np.concatenate(([0], np.flatnonzero(np.diff(buckets)) + 1))
+            ends = np.concatenate((starts[1:], [len(ts)]))
+            m = len(starts)
+            self._reserve(self.n + m)
+            self.start[self.n:self.n + m] = buckets[starts]
+            self.ohlc[self.n:self.n + m, 0] = prices[starts]
+            self.ohlc[self.n:self.n + m, 1] = np.maximum.reduceat(prices, starts)
+            self.ohlc[self.n:self.n + m, 2] = np.minimum.reduceat(prices, starts)
+            self.ohlc[self.n:self.n + m, 3] = prices[ends - 1]
+            self.count[self.n:self.n + m] = ends - starts
+            self.n += m
+
+    def range(self, start=None, end=None):
+        with self._lock:
+            starts = self.start[:self.n]
+            lo = 0 if start is None else int(np.searchsorted(starts, self.bucket(start)))
+            hi = self.n if end is None else int(np.searchsorted(starts, end, side="right"))
+            return starts[lo:hi].copy(), self.ohlc[lo:hi].copy()
+
+
+class RollupIndex:
+    def __init__(self, resolutions=RESOLUTIONS):
+        self.rollups = {name: Rollup(step, OFFSETS.get(name, 0)) for name, step in resolutions.items()}
+
+    def update(self, ts, price):
+        for rollup in self.rollups.values():
+            rollup.update(ts, price)
+
+    def extend(self, ts, prices):
+        for rollup in self.rollups.values():
+            rollup.extend(ts, prices)
+
+    def query(self, resolution, start=None, end=None):
+        return self.rollups[resolution].range(start, end)
+
+
+def lttb(x, y, threshold):
+    # Largest-Triangle-Three-Buckets: görsel şekli koruyarak en fazla `threshold`
+    # noktanın indekslerini seçer. İlk ve son nokta her zaman korunur.
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_lo, next_hi = edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n
+        if next_hi <= next_lo:
+            next_hi = next_lo + 1
+        avg_x = x[next_lo:next_hi].mean()
+        avg_y = y[next_lo:next_hi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
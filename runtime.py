@@ -81,18 +81,18 @@
             <section class="mb-12">
                 <div class="grid grid-cols-1 md:grid-cols-3 gap-6">
                     <!-- Current Price Card -->
-                    <div class="bg-white rounded-xl shadow-md p-6 flex flex-col items-center price-up">
+                    <div id="price-card" class="bg-white rounded-xl shadow-md p-6 flex flex-col items-center price-up">
                         <div class="flex items-center mb-4">
                             <i class="fas fa-chart-line text-2xl text-green-500 mr-3"></i>
                             <h2 class="text-xl font-semibold">Current Gold Price</h2>
                         </div>
                         <div class="text-center">
-                            <p class="text-4xl font-bold text-gold-dark my-3">$1,924.56</p>
+                            <p id="current-price" class="text-4xl font-bold text-gold-dark my-3">$1,924.56</p>
                             <div class="flex justify-center items-center">
-                                <span class="text-green-500 font-medium mr-2">
+                                <span id="price-change" class="text-green-500 font-medium mr-2">
                                     <i class="fas fa-caret-up mr-1"></i> 1.24%
                                 </span>
-                                <span class="text-gray-500 text-sm">+$23.50 today</span>
+                                <span id="price-change-abs" class="text-gray-500 text-sm">+$23.50 today</span>
                             </div>
                         </div>
                     </div>
@@ -107,8 +107,8 @@
                             <div class="w-full bg-gray-200 rounded-full h-4 mb-3">
                                 <div class="bg-green-500 h-4 rounded-full" style="width: 72%"></div>
                             </div>
-                            <p class="text-lg font-medium text-green-600 mb-1">72% Confidence</p>
-                            <p class="text-gray-600">Next 6 hours: <span class="font-medium">Upward Trend</span></p>
+                            <p id="prediction-price" class="text-lg font-medium text-green-600 mb-1">72% Confidence</p>
+                            <p class="text-gray-600">Next 24 hours: <span id="prediction-trend" class="font-medium">Upward Trend</span></p>
                         </div>
                     </div>
 
@@ -142,12 +142,12 @@
                     <!-- Price Chart -->
                     <div class="bg-white rounded-xl shadow-md p-6">
                         <div class="flex justify-between items-center mb-6">
-                            <h2 class="text-xl font-semibold">Gold Price (24h)</h2>
+                            <h2 id="chart-title" class="text-xl font-semibold">Gold Price (24h)</h2>
                             <div class="flex space-x-2">
-                                <button class="px-3 py-1 bg-gray-100 rounded text-sm">1D</button>
-                                <button class="px-3 py-1 bg-gray-100 rounded text-sm">1W</button>
-                                <button class="px-3 py-1 bg-gold-dark text-white rounded text-sm">1M</button>
-                                <button class="px-3 py-1 bg-gray-100 rounded text-sm">1Y</button>
+                                <button data-range="1D" class="range-btn px-3 py-1 bg-gold-dark text-white rounded text-sm">1D</button>
+                                <button data-range="1W" class="range-btn px-3 py-1 bg-gray-100 rounded text-sm">1W</button>
+                                <button data-range="1M" class="range-btn px-3 py-1 bg-gray-100 rounded text-sm">1M</button>
+                                <button data-range="1Y" class="range-btn px-3 py-1 bg-gray-100 rounded text-sm">1Y</button>
                             </div>
                         </div>
                         <div class="chart-container">
@@ -307,11 +307,10 @@
         const priceChart = new Chart(priceCtx, {
             type: 'line',
             data: {
-                labels: Array.from({length: 24}, (_, i) => `${i}:00`),
+                labels: [],
                 datasets: [{
                     label: 'Gold Price (USD)',
-                    data: [1910, 1912, 1915, 1918, 1920, 1922, 1921, 1920, 1918, 1916, 1915, 1917, 
-                           1918, 1919, 1920, 1921, 1922, 1923, 1924, 1925, 1924, 1923, 1924, 1925],
+                    data: [],
                     borderColor: '#FFD700',
                     backgroundColor: 'rgba(255, 215, 0, 0.1)',
                     borderWidth: 2,
@@ -339,42 +338,141 @@
             }
         });
 
-        // Simulate price updates
-        function updatePrice() {
-            const currentPriceEl = document.querySelector('.price-up');
-            const priceEl = document.querySelector('.text-4xl');
-            const changeEl = document.querySelector('.text-green-500');
-            
-            // Random price change
-            const currentPrice = parseFloat(priceEl.textContent.replace('$', '').replace(',', ''));
-            const change = (Math.random() - 0.5) * 5;
-            const newPrice = currentPrice + change;
-            const percentChange = (change / currentPrice * 100).toFixed(2);
-            
-            // Update UI
-            priceEl.textContent = `$${newPrice.toFixed(2)}`;
-            
-            if (change > 0) {
-                changeEl.innerHTML = `<i class="fas fa-caret-up mr-1"></i> ${percentChange}%`;
-                changeEl.className = 'text-green-500 font-medium mr-2';
-                currentPriceEl.classList.remove('price-down');
-                currentPriceEl.classList.add('price-up');
-            } else {
-                changeEl.innerHTML = `<i class="fas fa-caret-down mr-1"></i> ${Math.abs(percentChange)}%`;
-                changeEl.className = 'text-red-500 font-medium mr-2';
-                currentPriceEl.classList.remove('price-up');
-                currentPriceEl.classList.add('price-down');
+        // Ranges map to candle intervals served by /api/candles
+        const RANGES = {
+            '1D': {interval: '1h', seconds: 86400, title: '24h'},
+            '1W': {interval: '1h', seconds: 7 * 86400, title: '1 Week'},
+            '1M': {interval: '1d', seconds: 30 * 86400, title: '1 Month'},
+            '1Y': {interval: '1w', seconds: 365 * 86400, title: '1 Year'}
+        };
+        const INTERVAL_SECONDS = {'10m': 600, '1h': 3600, '1d': 86400, '1w': 604800};
+        // Weekly candles start on Monday 00:00 UTC (the epoch was a Thursday)
+        const INTERVAL_OFFSETS = {'1w': 3 * 86400};
+        const MAX_POINTS = 500;
+        let currentRange = '1D';
+        let chartCandles = [];
+        let symbol = null;
+        let dayBase = null;
+        const etags = {};
+
+        // Conditional GET: unchanged responses come back as 304 and are skipped
+        async function fetchJson(url) {
+            const headers = etags[url] ? {'If-None-Match': etags[url].tag} : {};
+            const response = await fetch(url, {headers});
+            if (response.status === 304) {
+                return etags[url].data;
             }
-            
-            // Update chart
-            const newData = priceChart.data.datasets[0].data.slice(1);
-            newData.push(newPrice);
-            priceChart.data.datasets[0].data = newData;
+            const data = await response.json();
+            etags[url] = {tag: response.headers.get('ETag'), data};
+            return data;
+        }
+
+        function renderPrice(latest) {
+            if (!latest) return;
+            symbol = latest.symbol;
+            dayBase = latest.price - latest.change;
+            const cardEl = document.getElementById('price-card');
+            const changeEl = document.getElementById('price-change');
+            const up = latest.change >= 0;
+            document.getElementById('current-price').textContent = `$${latest.price.toFixed(2)}`;
+            changeEl.innerHTML = `<i class="fas fa-caret-${up ? 'up' : 'down'} mr-1"></i> ${Math.abs(latest.change_pct).toFixed(2)}%`;
+            changeEl.className = `${up ? 'text-green-500' : 'text-red-500'} font-medium mr-2`;
+            document.getElementById('price-change-abs').textContent = `${up ? '+' : '-'}$${Math.abs(latest.change).toFixed(2)} today`;
+            cardEl.classList.toggle('price-up', up);
+            cardEl.classList.toggle('price-down', !up);
+        }
+
+        function renderPrediction(prediction) {
+            if (!prediction) return;
+            const up = prediction.direction === 'up';
+            document.getElementById('prediction-price').textContent = `Target: $${prediction.predicted_price.toFixed(2)}`;
+            document.getElementById('prediction-trend').textContent = up ? 'Upward Trend' : 'Downward Trend';
+        }
+
+        async function loadChart() {
+            const range = RANGES[currentRange];
+            const end = Math.floor(Date.now() / 1000);
+            const data = await fetchJson(`/api/candles?interval=${range.interval}&start=${end - range.seconds - end % 600}&max_points=${MAX_POINTS}`);
+            const candles = data ? data.candles : [];
+            chartCandles = candles.map(c => c.slice());
+            priceChart.data.labels = candles.map(c => new Date(c[0] * 1000).toLocaleString());
+            priceChart.data.datasets[0].data = candles.map(c => c[4]);
             priceChart.update();
+            document.getElementById('chart-title').textContent = `Gold Price (${range.title})`;
+        }
+
+        async function updatePrice() {
+            try {
+                renderPrice(await fetchJson('/api/price/latest'));
+                renderPrediction(await fetchJson('/api/prediction/latest'));
+                await loadChart();
+            } catch (e) {
+                console.error('API error', e);
+            }
         }
 
-        // Update price every 5 seconds
-        setInterval(updatePrice, 5000);
+        // Apply a pushed tick to the last candle instead of refetching the series
+        function applyTick(tick) {
+            if (dayBase !== null) {
+                const change = tick.price - dayBase;
+                renderPrice({symbol: tick.symbol, price: tick.price, change, change_pct: change / dayBase * 100});
+            }
+            const range = RANGES[currentRange];
+            const step = INTERVAL_SECONDS[range.interval];
+            const bucket = tick.timestamp - (tick.timestamp + (INTERVAL_OFFSETS[range.interval] || 0)) % step;
+            const labels = priceChart.data.labels;
+            const data = priceChart.data.datasets[0].data;
+            const last = chartCandles[chartCandles.length - 1];
+            if (last && last[0] === bucket) {
+                last[2] = Math.max(last[2], tick.price);
+                last[3] = Math.min(last[3], tick.price);
+                last[4] = tick.price;
+                data[data.length - 1] = tick.price;
+            } else {
+                chartCandles.push([bucket, tick.price, tick.price, tick.price, tick.price]);
+                labels.push(new Date(bucket * 1000).toLocaleString());
+                data.push(tick.price);
+                while (chartCandles.length && chartCandles[0][0] < bucket - range.seconds) {
+                    chartCandles.shift();
+                    labels.shift();
+                    data.shift();
+                }
+            }
+            priceChart.update('none');
+        }
+
+        document.querySelectorAll('.range-btn').forEach(button => {
+            button.addEventListener('click', () => {
+                document.querySelectorAll('.range-btn').forEach(b => {
+                    b.classList.remove('bg-gold-dark', 'text-white');
+                    b.classList.add('bg-gray-100');
+                });
+                button.classList.add('bg-gold-dark', 'text-white');
+                button.classList.remove('bg-gray-100');
+                currentRange = button.dataset.range;
+                loadChart();
+            });
+        });
+
+        // Server push: one event per new price instead of polling every 5 seconds
+        const source = new EventSource('/api/stream');
+        let streamErrored = false;
+        source.addEventListener('tick', event => {
+            const tick = JSON.parse(event.data);
+            if (tick.symbol === symbol) applyTick(tick);
+        });
+        source.addEventListener('prediction', event => {
+            const prediction = JSON.parse(event.data);
+            if (prediction && prediction.symbol === symbol) renderPrediction(prediction);
+        });
+        source.onerror = () => { streamErrored = true; };
+        source.onopen = () => {
+            // Resync anything missed while the stream was disconnected
+            if (streamErrored) updatePrice();
+            streamErrored = false;
+        };
+
+        updatePrice();
 
         // Telegram bot simulation
         document.querySelector('.bg-white button').addEventListener('click', function() {
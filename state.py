@@ -0,0 +1,87 @@
+import os
+import logging
+import threading
+from tick_store import TickStore, SEGMENT_PREFIX
+from online_model import OnlineLinearRegression
+from features import FeaturePipeline
+from rollups import RollupIndex
+
+
+class SymbolState:
+    def __init__(self, symbol, store, model, features):
+        self.symbol = symbol
+        self.store = store
+        self.model = model
+        self.features = features
+        self.rollups = RollupIndex()
+        self.trained = 0
+        self.lock = threading.Lock()
+
+    @classmethod
+    def load(cls, tick_dir, symbol, decay=1.0, window=None, readonly=False):
+        store = TickStore(os.path.join(tick_dir, symbol), readonly=readonly)
+        state = cls(symbol, store, OnlineLinearRegression(decay=decay, window=window),
+                    FeaturePipeline(history=False))
+        state.rebuild()
+        return state
+
+    def rebuild(self):
+        with self.lock:
+            self._rebuild()
+
+    def insert_history(self, ts, prices):
+        # Geçmişe eklenen satırlar depo indekslerini kaydırır; eğitim aşaması arada
+        # eski `trained` konumuyla okumasın diye ekleme ve yeniden kurulum aynı kilitte
+        with self.lock:
+            inserted = self.store.insert_many(ts, prices)
+            if inserted:
+                self._rebuild()
+            return inserted
+
+    def follow(self):
+        # İzleyici süreç: lider aynı depoya yazar. Yeni satırlar özet indeksine eklenir;
+        # geçmişe ekleme olduysa baştan kurulur. Son bilinen tick'ten sonraki satırları döndürür.
+        last = self.store.last
+        change = self.store.refresh()
+        if change is None:
+            return self.store.read(len(self.store))
+        ts, prices = self.store.range(last[0] + 1 if last else None)
+        if change == "rewrite":
+            self.rebuild()
+        else:
+            self.rollups.extend(ts, prices)
+        return ts, prices
+
+    def promote(self):
+        # Lider olunca depo yazılabilir açılır; izlerken eğitilmeyen model geçmişten kurulur
+        with self.lock:
+            if self.store.readonly:
+                self.store.open_writer()
+                self._rebuild()
+
+    def _rebuild(self):
+        # Model ve özellikleri depodaki tüm geçmişten vektörel olarak yeniden kur
+        ts, prices = self.store.read()
+        self.model.fit_arrays(ts, prices)
+        self.features = FeaturePipeline(self.features.lags, self.features.window, history=self.features.history)
+        self.features.extend(ts, prices)
+        self.trained = len(ts)
+        rollups = RollupIndex()
+        rollups.extend(ts, prices)
+        # Kurulum sırasında eklenen tick'ler yeni indekse de işlenir
+        rollups.extend(*self.store.read(len(ts)))
+        self.rollups = rollups
+
+
+def migrate_flat_store(tick_dir, symbol):
+    # Tek sembollü sürüm segmentleri doğrudan tick_dir altına yazıyordu
+    if not os.path.isdir(tick_dir):
+        return
+    flat = [name for name in os.listdir(tick_dir) if name.startswith(SEGMENT_PREFIX)]
+    target = os.path.join(tick_dir, symbol)
+    if not flat or os.path.exists(target):
+        return
+    os.makedirs(target)
+    for name in flat:
+        os.replace(os.path.join(tick_dir, name), os.path.join(target, name))
+    logging.info(f"🗂️ {len(flat)} segment {target} altına taşındı")
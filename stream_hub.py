@@ -0,0 +1,68 @@
+import os
+import json
+import queue
+import logging
+import threading
+
+STREAM_CLIENT_BUFFER = int(os.getenv("STREAM_CLIENT_BUFFER", "32"))
+STREAM_HEARTBEAT_SECONDS = float(os.getenv("STREAM_HEARTBEAT_SECONDS", "15"))
+STREAM_MAX_CLIENTS = int(os.getenv("STREAM_MAX_CLIENTS", "1000"))
+
+
+class StreamClient:
+    def __init__(self, buffer_size):
+        self.queue = queue.Queue(maxsize=buffer_size)
+        self.dropped = False
+
+
+class StreamHub:
+    # Her olay bir kez serileştirilir ve bağlı her istemcinin sınırlı tamponuna
+    # eklenir. Tamponu dolan (yavaş) istemci bağlantısı düşürülür; yayıncı asla beklemez.
+    def __init__(self, buffer_size=STREAM_CLIENT_BUFFER, max_clients=STREAM_MAX_CLIENTS):
+        self.buffer_size = buffer_size
+        self.max_clients = max_clients
+        self._clients = set()
+        self._lock = threading.Lock()
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self):
+        with self._lock:
+            if len(self._clients) >= self.max_clients:
+                return None
+            client = StreamClient(self.buffer_size)
+            self._clients.add(client)
+            return client
+
+    def unsubscribe(self, client):
+        with self._lock:
+            self._clients.discard(client)
+
+    def publish(self, event, data):
+        message = f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+        with self._lock:
+            clients = list(self._clients)
+            self.published += 1
+        for client in clients:
+            try:
+                client.queue.put_nowait(message)
+            except queue.Full:
+                client.dropped = True
+                self.unsubscribe(client)
+                self.dropped += 1
+                logging.warning("⚠️ Yavaş akış istemcisi düşürüldü")
+
+    def stream(self, client, heartbeat=STREAM_HEARTBEAT_SECONDS):
+        try:
+            yield "retry: 5000\n\n"
+            while not client.dropped:
+                try:
+                    yield client.queue.get(timeout=heartbeat)
+                except queue.Empty:
+                    yield ": ping\n\n"
+        finally:
+            self.unsubscribe(client)
+
+    def stats(self):
+        with self._lock:
+            return {"clients": len(self._clients), "published": self.published, "dropped": self.dropped}
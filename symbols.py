@@ -0,0 +1,98 @@
+import os
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+SYMBOLS = os.getenv("SYMBOLS", "XAUUSD")
+FMP_BATCH_SIZE = int(os.getenv("FMP_BATCH_SIZE", "50"))
+FETCH_CONCURRENCY = int(os.getenv("FETCH_CONCURRENCY", "8"))
+
+
+class SymbolRegistry:
+    def __init__(self, symbols):
+        self.symbols = list(dict.fromkeys(s.strip().upper() for s in symbols if s.strip()))
+        if not self.symbols:
+            raise ValueError("en az bir sembol gerekli")
+
+    @classmethod
+    def from_env(cls):
+        return cls(SYMBOLS.split(","))
+
+    @property
+    def primary(self):
+        return self.symbols[0]
+
+    def __iter__(self):
+        return iter(self.symbols)
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def __contains__(self, symbol):
+        return symbol in self.symbols
+
+
+def _valid_price(value):
+    try:
+        price = float(value)
+    except (TypeError, ValueError):
+        return None
+    return price if price > 0 else None
+
+
+def parse_batch(response):
+    prices = {}
+    for row in response.json():
+        price = _valid_price(row.get("price"))
+        if row.get("symbol") and price is not None:
+            prices[row["symbol"].upper()] = price
+    return prices
+
+
+def parse_single(response):
+    price = _valid_price(response.json()[0]["price"])
+    if price is None:
+        raise ValueError("geçersiz fiyat")
+    return price
+
+
+class QuoteFetcher:
+    # Önce FMP'nin virgülle birleştirilmiş toplu quote çağrısı denenir; yanıtta
+    # eksik kalan semboller sınırlı eşzamanlılıkla tek tek (hedged) çekilir.
+    def __init__(self, client, base_url, api_key, hedged=True,
+                 batch_size=FMP_BATCH_SIZE, concurrency=FETCH_CONCURRENCY):
+        self.client = client
+        self.base_url = base_url
+        self.api_key = api_key
+        self.hedged = hedged
+        self.batch_size = batch_size
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="fetch")
+
+    def _batch(self, symbols):
+        url = f"{self.base_url}/quote/{','.join(symbols)}?apikey={self.api_key}"
+        return parse_batch(self.client.get(url, name="fmp_batch_quote"))
+
+    def _single(self, symbol):
+        endpoints = [
+            ("fmp_quote", f"{self.base_url}/quote/{symbol}?apikey={self.api_key}"),
+            ("fmp_quote_short", f"{self.base_url}/quote-short/{symbol}?apikey={self.api_key}"),
+        ]
+        return self.client.first_valid(endpoints, parse_single, hedged=self.hedged)
+
+    def fetch(self, symbols):
+        symbols = list(symbols)
+        prices = {}
+        if len(symbols) > 1:
+            chunks = [symbols[i:i + self.batch_size] for i in range(0, len(symbols), self.batch_size)]
+            for future in as_completed([self._executor.submit(self._batch, chunk) for chunk in chunks]):
+                try:
+                    prices.update(future.result())
+                except Exception as e:
+                    logging.warning(f"⚠️ Toplu quote hatası: {e}")
+        missing = [symbol for symbol in symbols if symbol not in prices]
+        futures = {self._executor.submit(self._single, symbol): symbol for symbol in missing}
+        for future in as_completed(futures):
+            try:
+                prices[futures[future]] = future.result()
+            except Exception as e:
+                logging.warning(f"⚠️ {futures[future]} verisi alınamadı: {e}")
+        return prices
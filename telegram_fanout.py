@@ -0,0 +1,313 @@
+import os
+import json
+import time
+import queue
+import hashlib
+import logging
+import threading
+from collections import deque
+import requests
+import metrics
+
+SUBSCRIBERS_FILE = os.getenv("SUBSCRIBERS_FILE", "subscribers.json")
+TELEGRAM_GLOBAL_RATE = float(os.getenv("TELEGRAM_GLOBAL_RATE", "30"))
+TELEGRAM_PER_CHAT_RATE = float(os.getenv("TELEGRAM_PER_CHAT_RATE", "1"))
+TELEGRAM_WORKERS = int(os.getenv("TELEGRAM_WORKERS", "8"))
+TELEGRAM_DEDUP_TTL = float(os.getenv("TELEGRAM_DEDUP_TTL", "600"))
+TELEGRAM_MAX_ATTEMPTS = int(os.getenv("TELEGRAM_MAX_ATTEMPTS", "5"))
+TELEGRAM_OFFSET_FILE = os.getenv("TELEGRAM_OFFSET_FILE", "telegram_offset.json")
+
+
+class SubscriberRegistry:
+    def __init__(self, path=SUBSCRIBERS_FILE, seed=None):
+        self.path = path
+        self.seed = [str(chat_id) for chat_id in seed or []]
+        self._lock = threading.Lock()
+        self._subscribers = {}
+        self._sig = None
+        self._refresh()
+
+    def _signature(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_ino, st.st_size)
+
+    def _refresh(self):
+        # Dosyayı başka bir süreç (lider) değiştirdiyse yeniden okunur
+        sig = self._signature()
+        if sig is not None and sig == self._sig:
+            return
+        subscribers = {}
+        if sig is not None:
+            with open(self.path) as f:
+                subscribers = json.load(f)
+        for chat_id in self.seed:
+            subscribers.setdefault(chat_id, {"active": True, "added": int(time.time())})
+        self._subscribers = subscribers
+        self._sig = sig
+
+    def _save(self):
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self._subscribers, f)
+        os.replace(tmp, self.path)
+        self._sig = self._signature()
+
+    def add(self, chat_id):
+        # Değiştirmeden önce diskteki güncel liste okunur: önceki liderin eklediği
+        # aboneler eski bellek kopyasıyla ezilmesin
+        with self._lock:
+            self._refresh()
+            entry = self._subscribers.setdefault(str(chat_id), {"added": int(time.time())})
+            entry["active"] = True
+            self._save()
+
+    def deactivate(self, chat_id):
+        with self._lock:
+            self._refresh()
+            entry = self._subscribers.get(str(chat_id))
+            if entry and entry.get("active"):
+                entry["active"] = False
+                self._save()
+
+    def active(self):
+        with self._lock:
+            self._refresh()
+            return [chat_id for chat_id, entry in self._subscribers.items() if entry.get("active")]
+
+    def is_active(self, chat_id):
+        with self._lock:
+            self._refresh()
+            return bool(self._subscribers.get(str(chat_id), {}).get("active"))
+
+    def __len__(self):
+        return len(self.active())
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        # Bir jeton ayırır ve kullanılabilir olana kadar beklenecek süreyi döndürür
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def acquire(self):
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
+
+
+class Broadcast:
+    def __init__(self, total):
+        self.total = total
+        self.remaining = total
+        self.sent = 0
+        self.failed = 0
+        self.started = time.monotonic()
+        self.finished = None
+
+
+class FanoutEngine:
+    # Tek bir mesajı tüm abonelere kuyruk + işçi havuzu ile gönderir. Telegram'ın
+    # genel (~30 msg/s) ve sohbet başına (~1 msg/s) sınırları jeton kovalarıyla
+    # uygulanır; 429 yanıtındaki retry_after süresince tüm işçiler bekler.
+    def __init__(self, client, base_url, token, registry, global_rate=TELEGRAM_GLOBAL_RATE,
+                 per_chat_rate=TELEGRAM_PER_CHAT_RATE, workers=TELEGRAM_WORKERS,
+                 dedup_ttl=TELEGRAM_DEDUP_TTL, max_attempts=TELEGRAM_MAX_ATTEMPTS):
+        self.client = client
+        self.url = f"{base_url}/bot{token}/sendMessage"
+        self.registry = registry
+        self.global_bucket = TokenBucket(global_rate)
+        self.per_chat_rate = per_chat_rate
+        self.dedup_ttl = dedup_ttl
+        self.max_attempts = max_attempts
+        self._chat_buckets = {}
+        self._recent = {}
+        self._expiry = deque()
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+        self._queue = queue.Queue()
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self.duplicates = 0
+        self.last_throughput = 0.0
+        self.latency = metrics.histogram("telegram_broadcast_seconds", (1, 5, 15, 30, 60, 120, 300, 600, 1800))
+        for i in range(workers):
+            threading.Thread(target=self._run, name=f"telegram-{i}", daemon=True).start()
+
+    def _is_duplicate(self, text):
+        key = hashlib.sha1(text.encode()).hexdigest()
+        now = time.monotonic()
+        with self._lock:
+            # TTL sabit olduğundan süreler eklenme sırasıyla artar: yalnızca baştaki
+            # süresi dolmuş anahtarlar atılır (amortize O(1))
+            while self._expiry and self._expiry[0][0] <= now:
+                expires, old = self._expiry.popleft()
+                if self._recent.get(old) == expires:
+                    del self._recent[old]
+            if key in self._recent:
+                self.duplicates += 1
+                return True
+            self._recent[key] = now + self.dedup_ttl
+            self._expiry.append((self._recent[key], key))
+            return False
+
+    def broadcast(self, text, chat_ids=None, dedup=True):
+        # Komut yanıtları dedup=False ile gönderilir: aynı komutu tekrarlayan kullanıcı yine yanıt almalı
+        if dedup and self._is_duplicate(text if chat_ids is None else f"{sorted(chat_ids)}:{text}"):
+            logging.info("↩️ Aynı mesaj yakın zamanda gönderildi, atlandı")
+            return None
+        chat_ids = self.registry.active() if chat_ids is None else list(chat_ids)
+        job = Broadcast(len(chat_ids))
+        for chat_id in chat_ids:
+            self._queue.put((chat_id, text, job, 1))
+        return job
+
+    def _chat_bucket(self, chat_id):
+        with self._lock:
+            bucket = self._chat_buckets.get(chat_id)
+            if bucket is None:
+                bucket = self._chat_buckets[chat_id] = TokenBucket(self.per_chat_rate, 1.0)
+            return bucket
+
+    def _finish(self, job, ok):
+        with self._lock:
+            if ok:
+                job.sent += 1
+                self.sent += 1
+            else:
+                job.failed += 1
+                self.failed += 1
+            job.remaining -= 1
+            done = job.remaining == 0
+        if done:
+            job.finished = time.monotonic()
+            elapsed = max(job.finished - job.started, 1e-9)
+            self.last_throughput = job.total / elapsed
+            self.latency.observe(elapsed)
+            logging.info(
+                f"📤 Telegram yayını tamamlandı: {job.sent}/{job.total} sohbet, "
+                f"{elapsed:.1f}s ({self.last_throughput:.1f} msg/s)"
+            )
+
+    def _run(self):
+        while True:
+            chat_id, text, job, attempt = self._queue.get()
+            try:
+                self._deliver(chat_id, text, job, attempt)
+            except Exception as e:
+                # İşçi ölürse teslimat kalıcı olarak durur; hata bu mesajı başarısız sayar
+                logging.error(f"❌ Telegram işçisi hatası ({chat_id}): {e}")
+                self._finish(job, False)
+
+    def _deliver(self, chat_id, text, job, attempt):
+        pause = self._paused_until - time.monotonic()
+        if pause > 0:
+            time.sleep(pause)
+        self._chat_bucket(chat_id).acquire()
+        self.global_bucket.acquire()
+        try:
+            self.client.post(self.url, name="telegram", retries=0, data={"chat_id": chat_id, "text": text})
+            self._finish(job, True)
+        except requests.HTTPError as e:
+            self._handle_error(chat_id, text, job, attempt, e.response)
+        except Exception as e:
+            self._retry(chat_id, text, job, attempt, f"{e}")
+
+    def _handle_error(self, chat_id, text, job, attempt, response):
+        try:
+            body = response.json()
+        except ValueError:
+            body = {}
+        if not isinstance(body, dict):
+            body = {}
+        if response.status_code == 429:
+            retry_after = float(body.get("parameters", {}).get("retry_after", 1))
+            with self._lock:
+                self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+            self._retry(chat_id, text, job, attempt, f"429, retry_after={retry_after}")
+        elif response.status_code in (400, 403):
+            # Bot engellenmiş ya da sohbet yok: yeniden deneme anlamsız
+            logging.warning(f"⚠️ {chat_id} sohbetine gönderilemedi: {body.get('description', response.status_code)}")
+            if response.status_code == 403:
+                self.registry.deactivate(chat_id)
+            self._finish(job, False)
+        else:
+            self._retry(chat_id, text, job, attempt, f"HTTP {response.status_code}")
+
+    def _retry(self, chat_id, text, job, attempt, reason):
+        if attempt >= self.max_attempts:
+            logging.error(f"Telegram hatası ({chat_id}): {reason}")
+            self._finish(job, False)
+            return
+        with self._lock:
+            self.retried += 1
+        self._queue.put((chat_id, text, job, attempt + 1))
+
+    def stats(self):
+        return {
+            "subscribers": len(self.registry),
+            "queued": self._queue.qsize(),
+            "sent": self.sent,
+            "failed": self.failed,
+            "retried": self.retried,
+            "duplicates": self.duplicates,
+            "last_throughput": round(self.last_throughput, 2),
+        }
+
+
+def load_offset(path=TELEGRAM_OFFSET_FILE):
+    # getUpdates offset'i paylaşılan dosyada tutulur; yeni lider onaylanmış
+    # güncellemeleri yeniden işlemez
+    try:
+        with open(path) as f:
+            return json.load(f).get("offset", 0)
+    except FileNotFoundError:
+        return 0
+
+
+def save_offset(offset, path=TELEGRAM_OFFSET_FILE):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump({"offset": offset}, f)
+    os.replace(tmp, path)
+
+
+def poll_subscribers(client, base_url, token, registry, offset=0, on_command=None):
+    # /start ve /stop komutlarını getUpdates ile işler; diğer komutlar `on_command`a
+    # iletilir. Bir sonraki offset'i döndürür.
+    url = f"{base_url}/bot{token}/getUpdates"
+    updates = client.get(url, name="telegram_updates", params={"offset": offset, "timeout": 0}).json()
+    for update in updates.get("result", []):
+        offset = max(offset, update["update_id"] + 1)
+        message = update.get("message") or {}
+        text = (message.get("text") or "").strip()
+        chat_id = message.get("chat", {}).get("id")
+        if chat_id is None:
+            continue
+        # Tek bir güncellemedeki hata partinin kalanını ve offset kaydını engellemez
+        try:
+            if text.startswith("/start"):
+                registry.add(chat_id)
+                logging.info(f"👤 Yeni abone: {chat_id}")
+            elif text.startswith("/stop"):
+                registry.deactivate(chat_id)
+                logging.info(f"👋 Abonelik bitti: {chat_id}")
+            elif text.startswith("/") and on_command:
+                on_command(chat_id, text)
+        except Exception as e:
+            logging.error(f"❌ Telegram güncellemesi işlenemedi ({update['update_id']}, {chat_id}): {e}")
+    return offset
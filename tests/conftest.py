@@ -0,0 +1,97 @@
+import os
+import sys
+import json
+import time
+import threading
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class StubRequest:
+    def __init__(self, method, path, query, form):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.form = form
+
+
+class StubServer:
+    # Yerel HTTP yer tutucu (FMP, Telegram Bot API): her yol için bir işleyici
+    # kaydedilir; işleyici StubRequest alır, (durum, JSON gövde[, başlıklar[, gecikme]]) döner.
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _handle(self, method):
+                parsed = urlparse(self.path)
+                query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+                length = int(self.headers.get("Content-Length") or 0)
+                form = {k: v[0] for k, v in parse_qs(self.rfile.read(length).decode()).items()}
+                request = StubRequest(method, parsed.path, query, form)
+                with stub._lock:
+                    stub.requests.append(request)
+                handler = stub.routes.get(parsed.path)
+                status, body, headers, delay = (404, {"error": "yok"}, {}, 0)
+                if handler:
+                    result = handler(request)
+                    status, body = result[0], result[1]
+                    headers = result[2] if len(result) > 2 else {}
+                    delay = result[3] if len(result) > 3 else 0
+                if delay:
+                    time.sleep(delay)
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._handle("GET")
+
+            def do_POST(self):
+                self._handle("POST")
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+
+    def route(self, path, handler):
+        self.routes[path] = handler
+
+    def hits(self, path):
+        with self._lock:
+            return [request for request in self.requests if request.path == path]
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def sequence(*responses):
+    # Ardışık çağrılarda sırayla yanıt veren işleyici; sonuncusu tekrarlanır
+    responses = list(responses)
+    lock = threading.Lock()
+
+    def handler(request):
+        with lock:
+            return responses.pop(0) if len(responses) > 1 else responses[0]
+    return handler
+
+
+@pytest.fixture
+def stub():
+    server = StubServer()
+    yield server
+    server.close()
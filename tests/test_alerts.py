@@ -0,0 +1,75 @@
+import json
+import pytest
+import alerts
+from alerts import AlertEngine
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "alerts.json")
+
+
+def snapshot(engine):
+    return {rule_id: rule.to_dict() for rule_id, rule in engine.rules.items()}
+
+
+def test_evaluate_journals_only_changed_rules(path):
+    engine = AlertEngine(path=path)
+    for value in (2310, 2320, 2330):
+        engine.add("1", "XAUUSD", "above", value, price=2300)
+    size = len(open(engine.journal, "rb").read().splitlines())
+
+    fired = engine.evaluate("XAUUSD", 2315, 1000)
+
+    assert [rule.value for rule, _ in fired] == [2310]
+    lines = open(engine.journal, "rb").read().splitlines()
+    assert len(lines) == size + 1
+    assert json.loads(lines[-1])["rule"]["armed"] is False
+    reopened = AlertEngine(path=path)
+    assert snapshot(reopened) == snapshot(engine)
+
+
+def test_other_process_changes_are_replayed(path):
+    leader, follower = AlertEngine(path=path), AlertEngine(path=path)
+    rule = follower.add("1", "XAUUSD", "below", 2200, price=2300)
+    other = follower.add("2", "XAUUSD", "change", 1, price=2300)
+    follower.remove(other.id, "2")
+
+    fired = leader.evaluate("XAUUSD", 2190, 1000)
+
+    assert [r.id for r, _ in fired] == [rule.id]
+    assert [r.id for r in follower.for_chat("1")] == [rule.id]
+    assert follower.for_chat("1")[0].armed is False
+    assert leader.add("3", "XAUUSD", "above", 2400).id == other.id + 1
+
+
+def test_compaction_keeps_state_and_concurrent_appends(path, monkeypatch):
+    monkeypatch.setattr(alerts, "ALERT_JOURNAL_SLACK", 0)
+    leader, follower = AlertEngine(path=path), AlertEngine(path=path)
+    for i in range(10):
+        leader.add(str(i), "XAUUSD", "above", 2301 + i, price=2300, hysteresis=0, cooldown=0)
+    # Her tick 10 kuralı tetikler ya da yeniden kurar; günlük kural sayısını aşar
+    for ts, price in enumerate((2320, 2290, 2320, 2290), start=1):
+        leader.evaluate("XAUUSD", price, ts)
+        leader.close()
+    follower.add("x", "XAUUSD", "below", 2000, price=2300)
+
+    # Anlık görüntü yalnızca sıkıştırmada yazılır
+    assert json.load(open(path))["next_id"] == 11
+    assert len(open(leader.journal, "rb").read().splitlines()) <= 11
+    leader.for_chat("x")
+    assert snapshot(AlertEngine(path=path)) == snapshot(leader)
+    follower.for_chat("x")
+    assert snapshot(follower) == snapshot(leader)
+
+
+def test_torn_journal_line_is_ignored_and_overwritten(path):
+    engine = AlertEngine(path=path)
+    engine.add("1", "XAUUSD", "above", 2400, price=2300)
+    with open(engine.journal, "ab") as f:
+        f.write(b'{"rule": {"id": 9')
+
+    reopened = AlertEngine(path=path)
+    assert list(reopened.rules) == [1]
+    reopened.add("1", "XAUUSD", "above", 2500, price=2300)
+    assert sorted(AlertEngine(path=path).rules) == [1, 2]
@@ -0,0 +1,71 @@
+import types
+import pytest
+from flask import Flask
+from api import ResponseCache, create_api
+from alerts import AlertEngine
+from symbols import SymbolRegistry
+from telegram_fanout import SubscriberRegistry
+
+AUTH = {"Authorization": "Bearer secret"}
+
+
+@pytest.fixture
+def subscribers(tmp_path):
+    return SubscriberRegistry(path=str(tmp_path / "subscribers.json"), seed=["1"])
+
+
+@pytest.fixture
+def engine(tmp_path):
+    return AlertEngine(path=str(tmp_path / "alerts.json"))
+
+
+def make_client(engine, subscribers, token="secret"):
+    state = types.SimpleNamespace(store=types.SimpleNamespace(last=(1000, 2300.0)))
+    app = Flask(__name__)
+    app.register_blueprint(create_api(SymbolRegistry(["XAUUSD"]), lambda symbol: state, {}, ResponseCache(),
+                                      86400, None, engine, subscribers, token))
+    return app.test_client()
+
+
+def test_alert_routes_require_token(engine, subscribers):
+    client = make_client(engine, subscribers)
+    assert client.get("/api/alerts?chat_id=1").status_code == 401
+    assert client.get("/api/alerts?chat_id=1", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    assert client.get("/api/alerts?chat_id=1", headers=AUTH).status_code == 200
+    assert make_client(engine, subscribers, token=None).get("/api/alerts?chat_id=1", headers=AUTH).status_code == 503
+
+
+def test_only_active_subscribers_can_have_alerts(engine, subscribers):
+    client = make_client(engine, subscribers)
+    body = {"chat_id": "2", "kind": "above", "value": 2400}
+    assert client.post("/api/alerts", json=body, headers=AUTH).status_code == 403
+
+    # Lider başka süreçte /start işlediğinde kayıt dosyadan yeniden okunur
+    SubscriberRegistry(path=subscribers.path).add("2")
+    assert client.post("/api/alerts", json=body, headers=AUTH).status_code == 201
+    SubscriberRegistry(path=subscribers.path).deactivate("2")
+    assert client.get("/api/alerts?chat_id=2", headers=AUTH).status_code == 403
+
+
+def test_delete_requires_owning_chat(engine, subscribers):
+    subscribers.add("2")
+    client = make_client(engine, subscribers)
+    rule = client.post("/api/alerts", json={"chat_id": "1", "kind": "below", "value": 2200}, headers=AUTH).json
+
+    assert client.delete(f"/api/alerts/{rule['id']}", headers=AUTH).status_code == 400
+    assert client.delete(f"/api/alerts/{rule['id']}?chat_id=2", headers=AUTH).status_code == 404
+    assert client.delete(f"/api/alerts/{rule['id']}?chat_id=1", headers=AUTH).status_code == 204
+    assert engine.rules == {}
+
+
+@pytest.mark.parametrize("body", [
+    [1, 2],
+    {"chat_id": "1", "kind": "above", "value": "nan"},
+    {"chat_id": "1", "kind": "above", "value": "inf"},
+    {"chat_id": "1", "kind": "above", "value": 2400, "hysteresis": "nan"},
+    {"chat_id": "1", "kind": "above", "value": 2400, "cooldown": "inf"},
+])
+def test_invalid_bodies_are_rejected(engine, subscribers, body):
+    client = make_client(engine, subscribers)
+    assert client.post("/api/alerts", json=body, headers=AUTH).status_code == 400
+    assert engine.rules == {}
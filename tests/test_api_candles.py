@@ -0,0 +1,65 @@
+import types
+import numpy as np
+from flask import Flask
+import api
+from api import ResponseCache, candles, create_api, ohlc, RAW_MAX_RANGE
+from symbols import SymbolRegistry
+from tick_store import TickStore
+
+
+def make_state(tmp_path, n):
+    store = TickStore(str(tmp_path / "XAUUSD"))
+    store.append_many(600 * np.arange(n), 2000 + np.sin(np.arange(n) / 50))
+    return types.SimpleNamespace(store=store, symbol="XAUUSD", rollups=types.SimpleNamespace(rollups={}))
+
+
+def test_ohlc_buckets():
+    starts, values = ohlc(np.array([0, 100, 700, 1300]), np.array([1.0, 3.0, 2.0, 5.0]), 600)
+    assert starts.tolist() == [0, 600, 1200]
+    assert values.tolist() == [[1.0, 3.0, 1.0, 3.0], [2.0, 2.0, 2.0, 2.0], [5.0, 5.0, 5.0, 5.0]]
+
+
+def test_raw_candles_are_capped_and_downsampled(tmp_path):
+    state = make_state(tmp_path, 5000)
+    end = 600 * 4999
+
+    rows = candles(state, "10m", 0, end, max_points=100)["candles"]
+
+    assert len(rows) == 100
+    assert rows[0][0] == end - RAW_MAX_RANGE and rows[-1][0] == end
+    state.store.close()
+
+
+def test_raw_candles_below_limit_are_not_downsampled(tmp_path, monkeypatch):
+    monkeypatch.setattr(api, "RAW_MAX_RANGE", 10 ** 9)
+    state = make_state(tmp_path, 300)
+
+    rows = candles(state, "10m", None, None)["candles"]
+
+    assert len(rows) == 145 and rows[-1][0] == 600 * 299
+    state.store.close()
+
+
+def test_cache_evicts_least_recently_used():
+    cache = ResponseCache(max_entries=2)
+    for key in ("a", "b"):
+        cache.get(("candles", "XAUUSD", key), lambda: key)
+    cache.get(("candles", "XAUUSD", "a"), lambda: "x")
+    cache.get(("candles", "XAUUSD", "c"), lambda: "c")
+
+    assert cache.stats() == {"entries": 2, "hits": 1, "misses": 3, "evicted": 1}
+    assert cache.get(("candles", "XAUUSD", "a"), lambda: "x")[0] == b'"a"'
+
+
+def test_candle_requests_in_same_bucket_share_cache_entry(tmp_path):
+    state = make_state(tmp_path, 300)
+    cache = ResponseCache()
+    app = Flask(__name__)
+    app.register_blueprint(create_api(SymbolRegistry(["XAUUSD"]), lambda symbol: state, {}, cache, 86400, None))
+    client = app.test_client()
+
+    bodies = {client.get(f"/api/candles?interval=1h&start={3600 + s}&end={7200 + s}").data for s in (0, 17, 3599)}
+
+    assert len(bodies) == 1
+    assert cache.stats()["misses"] == 1
+    state.store.close()
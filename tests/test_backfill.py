@@ -0,0 +1,200 @@
+import os
+import json
+import random
+from datetime import datetime, timezone
+import numpy as np
+import pytest
+from http_client import HttpClient
+from backfill import Backfiller, find_gaps, pages
+from state import SymbolState
+from tick_store import TickStore, MERGE_JOURNAL, import_csv, system_zone
+
+CHART = "/historical-chart/5min/XAUUSD"
+DAY = 86400
+T0 = 1_700_006_400  # 2023-11-15 00:00 UTC
+NOW = T0 + 4 * DAY - 300
+
+
+def chart(request):
+    # FMP gibi: from/to günleri dahil, en yeni çubuk başta, borsa saatiyle tarih
+    first = int(datetime.fromisoformat(request.query["from"]).replace(tzinfo=timezone.utc).timestamp())
+    last = int(datetime.fromisoformat(request.query["to"]).replace(tzinfo=timezone.utc).timestamp()) + DAY
+    rows = [{"date": datetime.fromtimestamp(t, timezone.utc).strftime("%Y-%m-%d %H:%M:%S"), "close": 2000 + t % DAY / 1000}
+            for t in range(first, last, 300)]
+    return 200, rows[::-1]
+
+
+@pytest.fixture
+def state(tmp_path):
+    # 1. ve 4. günler dolu, arada iki günlük boşluk
+    state = SymbolState.load(str(tmp_path / "ticks"), "XAUUSD")
+    ts = [T0 + i * 600 for i in range(144)] + [T0 + 3 * DAY + i * 600 for i in range(144)]
+    state.store.append_many(ts, [2000.0] * len(ts))
+    state.rebuild()
+    yield state
+    state.store.close()
+
+
+def backfiller(stub, tmp_path):
+    return Backfiller(HttpClient(retries=0), stub.url, "KEY", path=str(tmp_path / "backfill.json"),
+                      page_days=2, tz="UTC")
+
+
+def test_find_gaps_and_pages():
+    assert find_gaps([0, 600, 1200, 5000, 5600], 600, 1.5, now=9000) == [(1200, 5000), (5600, 9000)]
+    assert find_gaps([0, 600, 1200], 600, 1.5, now=1500) == []
+    utc = timezone.utc
+    assert pages([(T0 + DAY - 600, T0 + 3 * DAY), (T0 + 5 * DAY, T0 + 5 * DAY + 60)], utc, page_days=2) == [
+        ("2023-11-15", "2023-11-16"), ("2023-11-17", "2023-11-18"), ("2023-11-20", "2023-11-20")]
+
+
+def test_backfill_fills_gap_and_marks_it_exhausted(stub, tmp_path, state):
+    stub.route(CHART, chart)
+    filler = backfiller(stub, tmp_path)
+
+    inserted = filler.run(state, now=NOW)
+
+    assert inserted == 289
+    assert len(state.store) == 577 and state.trained == 577
+    assert filler.gaps(state.store, NOW) == []
+    assert {r.query["apikey"] for r in stub.hits(CHART)} == {"KEY"}
+    assert len(stub.hits(CHART)) == 2
+    assert json.load(open(filler.path))["XAUUSD"]["exhausted"] == [[T0 + DAY - 600, T0 + 3 * DAY]]
+    ts, _ = state.store.read()
+    assert (np.diff(ts) > 0).all()
+
+
+def test_checkpoint_resumes_without_refetching(stub, tmp_path, state, monkeypatch):
+    stub.route(CHART, chart)
+    filler = backfiller(stub, tmp_path)
+
+    def crash(ts, prices):
+        raise RuntimeError("süreç çöktü")
+    monkeypatch.setattr(state, "insert_history", crash)
+    with pytest.raises(RuntimeError):
+        filler.run(state, now=NOW)
+    monkeypatch.undo()
+    saved = json.load(open(filler.path))["XAUUSD"]
+    assert sorted(saved["pages"]) == ["2023-11-15:2023-11-16", "2023-11-17:2023-11-18"]
+
+    # Yeni süreç kontrol noktasından devam eder: sayfalar yeniden istenmez
+    resumed = backfiller(stub, tmp_path)
+    assert resumed.run(state, now=NOW) == 289
+    assert len(stub.hits(CHART)) == 2
+    assert resumed.stats()["pages_resumed"] == 2
+    assert json.load(open(filler.path))["XAUUSD"]["pages"] == {}
+
+
+def test_empty_provider_range_is_not_requested_again(stub, tmp_path, state):
+    stub.route(CHART, lambda request: (200, []))
+    filler = backfiller(stub, tmp_path)
+
+    assert filler.run(state, now=NOW) == 0
+    assert filler.run(state, now=NOW) == 0
+    assert backfiller(stub, tmp_path).run(state, now=NOW) == 0
+
+    assert len(stub.hits(CHART)) == 2
+
+
+def test_failed_page_keeps_gap_open(stub, tmp_path, state):
+    stub.route(CHART, lambda request: (500, {}) if request.query["from"] == "2023-11-17" else chart(request))
+    filler = backfiller(stub, tmp_path)
+
+    filler.run(state, now=NOW)
+    stub.route(CHART, chart)
+    filler.run(state, now=NOW)
+
+    assert filler.gaps(state.store, NOW) == []
+    assert filler.stats()["pages_failed"] == 1
+
+
+def test_insert_many_matches_sorted_merge(tmp_path):
+    rng = random.Random(0)
+    store = TickStore(str(tmp_path / "s"), segment_records=64)
+    base = sorted(rng.sample(range(0, 100000, 10), 500))
+    store.append_many(base, [float(t) for t in base])
+    expected = dict((t, float(t)) for t in base)
+    for _ in range(5):
+        batch = rng.sample(range(0, 110000, 5), 80)
+        # Var olan damgalarla çakışanlar atlanır
+        inserted = store.insert_many(batch, [-float(t) for t in batch])
+        new = {t: -float(t) for t in batch if t not in expected}
+        assert inserted == len(new)
+        expected.update(new)
+
+    ts, prices = store.read()
+    assert ts.tolist() == sorted(expected)
+    assert prices.tolist() == [expected[t] for t in sorted(expected)]
+    store.close()
+    reopened = TickStore(str(tmp_path / "s"), segment_records=64)
+    assert reopened.read()[0].tolist() == sorted(expected)
+    reopened.close()
+
+
+@pytest.mark.parametrize("after_journal", [True, False])
+def test_interrupted_merge_is_recovered(tmp_path, monkeypatch, after_journal):
+    root = str(tmp_path / "s")
+    store = TickStore(root, segment_records=16)
+    base = list(range(0, 6400, 100))
+    store.append_many(base, [1.0] * len(base))
+    batch = list(range(50, 3200, 100))
+
+    real = os.replace
+
+    def crash(src, dst):
+        # Günlükten sonra ilk segment adlandırmasında ya da günlük yazılmadan önce çök
+        if after_journal and dst.endswith(".bin") or not after_journal and dst.endswith(MERGE_JOURNAL):
+            raise OSError("çökme")
+        return real(src, dst)
+    monkeypatch.setattr(os, "replace", crash)
+    with pytest.raises(OSError):
+        store.insert_many(batch, [2.0] * len(batch))
+    monkeypatch.undo()
+
+    assert os.path.exists(os.path.join(root, MERGE_JOURNAL)) == after_journal
+    recovered = TickStore(root, segment_records=16)
+    expected = sorted(base + batch) if after_journal else base
+    assert recovered.read()[0].tolist() == expected
+    assert not [name for name in os.listdir(root) if name.endswith(".tmp") or name.startswith(MERGE_JOURNAL)]
+    recovered.close()
+
+
+def test_reload_picks_up_previous_leader_checkpoint(stub, tmp_path, state):
+    stub.route(CHART, lambda request: (200, []))
+    follower = backfiller(stub, tmp_path)
+    backfiller(stub, tmp_path).run(state, now=NOW)
+
+    follower.reload()
+
+    assert follower.run(state, now=NOW) == 0
+    assert len(stub.hits(CHART)) == 2
+
+
+def test_append_rejects_rows_not_after_last(tmp_path):
+    store = TickStore(str(tmp_path / "s"))
+    store.append(1000, 1.0)
+    for ts in (1000, 400):
+        with pytest.raises(ValueError):
+            store.append(ts, 2.0)
+    # Sıra dışı satır geçmişe eklenebilir; sıra korunur
+    assert store.insert_many([400], [2.0]) == 1
+    store.append(1600, 3.0)
+    assert store.read()[0].tolist() == [400, 1000, 1600]
+    store.close()
+
+
+def test_import_csv_applies_dst_per_row(tmp_path, monkeypatch):
+    path = tmp_path / "data.csv"
+    # Kış saatinde (CET) ve yaz saatinde (CEST) yazılmış satırlar, geri alınan saat iki kez
+    path.write_text("timestamp,price\n2024-01-15 12:00:00,1\n2024-07-15 12:00:00,2\n"
+                    "2024-10-27 02:30:00,3\n2024-10-27 02:30:00,4\n")
+    monkeypatch.setenv("TZ", "Europe/Berlin")
+    assert str(system_zone()) == "Europe/Berlin"
+    store = TickStore(str(tmp_path / "s"))
+
+    assert import_csv(store, str(path)) == 4
+
+    utc = [datetime(2024, 1, 15, 11, tzinfo=timezone.utc), datetime(2024, 7, 15, 10, tzinfo=timezone.utc),
+           datetime(2024, 10, 27, 0, 30, tzinfo=timezone.utc), datetime(2024, 10, 27, 1, 30, tzinfo=timezone.utc)]
+    assert store.read()[0].tolist() == [int(t.timestamp()) for t in utc]
+    store.close()
@@ -0,0 +1,33 @@
+import os
+import pytest
+import backtest
+from tick_store import TickStore, MERGE_JOURNAL
+
+
+def test_readonly_store_does_not_create_missing_directory(tmp_path):
+    root = tmp_path / "ticks" / "XAUUSD"
+    store = TickStore(str(root), readonly=True)
+    assert len(store) == 0 and store.last is None
+    assert not root.exists()
+
+
+def test_run_config_leaves_live_merge_untouched(tmp_path):
+    root = tmp_path / "XAUUSD"
+    writer = TickStore(str(root))
+    writer.append_many([1000 + 600 * i for i in range(50)], [2300.0 + i for i in range(50)])
+    # Liderin süren bir insert_many birleştirmesi: geçici segment ve günlük
+    (root / "seg-000000.bin.tmp").write_bytes(b"x" * 16)
+    (root / MERGE_JOURNAL).write_text('["seg-000000.bin"]')
+
+    result = backtest.run_config({"tick_dir": str(tmp_path), "symbol": "XAUUSD", "model": "naive",
+                                  "window": None, "horizon": 3600, "retrain": 10})
+
+    assert result["mae"] is not None
+    assert sorted(os.listdir(root)) == [MERGE_JOURNAL, "seg-000000.bin", "seg-000000.bin.tmp"]
+    writer.close()
+
+
+def test_run_rejects_missing_symbol(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        backtest.run(str(tmp_path), "XAGUSD", ["naive"], [None], [3600], workers=1)
+    assert not (tmp_path / "XAGUSD").exists()
@@ -0,0 +1,29 @@
+import numpy as np
+from features import FeaturePipeline
+
+
+def series(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return 600 * np.arange(n, dtype=np.int64), 2000 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+
+
+def test_rolling_pipeline_matches_full_history():
+    ts, prices = series(10000)
+    full = FeaturePipeline()
+    rolling = FeaturePipeline(history=False)
+    full.extend(ts[:7000], prices[:7000])
+    rolling.extend(ts[:7000], prices[:7000])
+    for i in range(7000, 10000, 333):
+        full.extend(ts[i:i + 333], prices[i:i + 333])
+        rolling.extend(ts[i:i + 333], prices[i:i + 333])
+    for t, p in zip(ts[-5:] + 600 * 5, prices[-5:]):
+        full.append(t, p)
+        rolling.append(t, p)
+
+    assert rolling.count == full.count == 10005
+    assert rolling.latest().keys() == full.latest().keys()
+    tail = len(rolling.matrix)
+    np.testing.assert_allclose(rolling.matrix, full.matrix[-tail:], rtol=1e-9, atol=1e-12)
+    assert tail >= rolling.context
+    # Tampon geçmişle büyümez
+    assert len(rolling._ts) <= 2 * 1024
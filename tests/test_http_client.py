@@ -0,0 +1,105 @@
+import pytest
+import requests
+import metrics
+import http_client
+from http_client import HttpClient
+from symbols import parse_single
+from conftest import sequence
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    # Geri çekilme süreleri kaydedilir, gerçekten beklenmez
+    recorded = []
+    monkeypatch.setattr(http_client.time, "sleep", recorded.append)
+    return recorded
+
+
+def test_retries_429_and_5xx_then_succeeds(stub, sleeps):
+    stub.route("/quote/XAUUSD", sequence((429, {}), (503, {}), (200, [{"price": 2400.5}])))
+    client = HttpClient(retries=2, backoff=0.5, max_backoff=8)
+    before = metrics.counter("http_t1_retries_total").value
+
+    response = client.get(f"{stub.url}/quote/XAUUSD", name="t1")
+
+    assert response.json() == [{"price": 2400.5}]
+    assert len(stub.hits("/quote/XAUUSD")) == 3
+    assert metrics.counter("http_t1_retries_total").value - before == 2
+    # Tam jitter: deneme n için [0, backoff * 2**n]
+    assert len(sleeps) == 2
+    assert 0 <= sleeps[0] <= 0.5 and 0 <= sleeps[1] <= 1.0
+
+
+def test_backoff_is_capped_and_honours_retry_after(stub, sleeps):
+    stub.route("/quote/XAUUSD", sequence((429, {}, {"Retry-After": "3"}), (200, [{"price": 1.0}])))
+    client = HttpClient(retries=1, backoff=100, max_backoff=0.25)
+
+    client.get(f"{stub.url}/quote/XAUUSD", name="t2")
+
+    assert sleeps == [3.0]
+
+    sleeps.clear()
+    stub.route("/quote/XAGUSD", sequence((500, {}), (200, [{"price": 1.0}])))
+    client.get(f"{stub.url}/quote/XAGUSD", name="t2")
+    assert len(sleeps) == 1 and sleeps[0] <= 0.25
+
+
+def test_gives_up_after_retries_and_counts_error(stub, sleeps):
+    stub.route("/quote/XAUUSD", lambda request: (502, {}))
+    client = HttpClient(retries=2, backoff=0.01)
+    before = metrics.counter("http_t3_errors_total").value
+
+    with pytest.raises(requests.HTTPError):
+        client.get(f"{stub.url}/quote/XAUUSD", name="t3")
+
+    assert len(stub.hits("/quote/XAUUSD")) == 3
+    assert metrics.counter("http_t3_errors_total").value - before == 1
+
+
+def test_client_errors_are_not_retried(stub, sleeps):
+    stub.route("/quote/XAUUSD", lambda request: (404, {}))
+    client = HttpClient(retries=3)
+
+    with pytest.raises(requests.HTTPError):
+        client.get(f"{stub.url}/quote/XAUUSD", name="t4")
+
+    assert len(stub.hits("/quote/XAUUSD")) == 1
+    assert sleeps == []
+
+
+def test_hedged_race_returns_first_valid_price(stub):
+    stub.route("/quote/XAUUSD", lambda request: (200, [{"price": 2400.0}], {}, 0.5))
+    stub.route("/quote-short/XAUUSD", lambda request: (200, [{"price": 2401.0}]))
+    client = HttpClient(retries=0)
+    endpoints = [("fmp_quote", f"{stub.url}/quote/XAUUSD"), ("fmp_quote_short", f"{stub.url}/quote-short/XAUUSD")]
+
+    assert client.first_valid(endpoints, parse_single, hedged=True) == 2401.0
+
+
+def test_hedged_race_skips_fast_invalid_answer(stub):
+    stub.route("/quote/XAUUSD", lambda request: (200, [{"price": 2400.0}], {}, 0.2))
+    stub.route("/quote-short/XAUUSD", lambda request: (200, [{"price": 0}]))
+    client = HttpClient(retries=0)
+    endpoints = [("fmp_quote", f"{stub.url}/quote/XAUUSD"), ("fmp_quote_short", f"{stub.url}/quote-short/XAUUSD")]
+
+    assert client.first_valid(endpoints, parse_single, hedged=True) == 2400.0
+
+
+def test_sequential_fallback_when_not_hedged(stub):
+    stub.route("/quote/XAUUSD", lambda request: (500, {}))
+    stub.route("/quote-short/XAUUSD", lambda request: (200, [{"price": 2399.0}]))
+    client = HttpClient(retries=0)
+    endpoints = [("fmp_quote", f"{stub.url}/quote/XAUUSD"), ("fmp_quote_short", f"{stub.url}/quote-short/XAUUSD")]
+
+    assert client.first_valid(endpoints, parse_single, hedged=False) == 2399.0
+    assert len(stub.hits("/quote/XAUUSD")) == 1
+
+
+def test_all_endpoints_invalid_raises(stub):
+    stub.route("/quote/XAUUSD", lambda request: (200, [{"price": -1}]))
+    stub.route("/quote-short/XAUUSD", lambda request: (500, {}))
+    client = HttpClient(retries=0)
+    endpoints = [("fmp_quote", f"{stub.url}/quote/XAUUSD"), ("fmp_quote_short", f"{stub.url}/quote-short/XAUUSD")]
+
+    with pytest.raises(Exception):
+        client.first_valid(endpoints, parse_single, hedged=True)
@@ -0,0 +1,17 @@
+import os
+import sys
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# main.py'nin doğrudan içe aktardığı modüller; state/modeller lazy ile tembel yüklenir
+STARTUP_MODULES = ["lazy", "metrics", "http_client", "symbols", "pipeline", "drive_sync", "model_artifact",
+                   "telegram_fanout", "api", "stream_hub", "alerts", "profiler", "backfill", "leader"]
+
+
+def test_startup_modules_do_not_import_numeric_stack():
+    code = (f"import sys\nfor name in {STARTUP_MODULES!r}:\n    __import__(name)\n"
+            "print(sorted(m for m in ('numpy', 'pandas', 'sklearn') if m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                         cwd=ROOT)
+    assert out.stdout.strip() == "[]"
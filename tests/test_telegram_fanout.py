@@ -0,0 +1,186 @@
+import time
+import pytest
+from http_client import HttpClient
+from telegram_fanout import SubscriberRegistry, FanoutEngine, poll_subscribers, load_offset, save_offset
+from conftest import sequence
+
+SEND = "/botTOKEN/sendMessage"
+
+
+def wait_done(job, timeout=5):
+    deadline = time.monotonic() + timeout
+    while job.remaining and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert job.remaining == 0
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return SubscriberRegistry(path=str(tmp_path / "subscribers.json"), seed=["1", "2"])
+
+
+def engine(stub, registry, **kwargs):
+    kwargs.setdefault("global_rate", 1000)
+    kwargs.setdefault("per_chat_rate", 1000)
+    return FanoutEngine(HttpClient(retries=0), stub.url, "TOKEN", registry, **kwargs)
+
+
+def test_429_pauses_for_retry_after_then_delivers(stub, registry):
+    times = []
+
+    def handler(request):
+        times.append(time.monotonic())
+        if len(times) == 1:
+            return 429, {"ok": False, "parameters": {"retry_after": 1}}
+        return 200, {"ok": True, "result": {}}
+    stub.route(SEND, handler)
+    fanout = engine(stub, registry, workers=1)
+
+    job = fanout.broadcast("merhaba", chat_ids=["1"])
+    wait_done(job)
+
+    assert (job.sent, job.failed) == (1, 0)
+    assert fanout.retried == 1
+    assert times[1] - times[0] >= 0.95
+
+
+def test_403_deactivates_chat(stub, registry):
+    stub.route(SEND, lambda request: (403, {"ok": False, "description": "Forbidden: bot was blocked by the user"})
+               if request.form["chat_id"] == "2" else (200, {"ok": True}))
+    fanout = engine(stub, registry)
+
+    job = fanout.broadcast("fiyat")
+    wait_done(job)
+
+    assert (job.sent, job.failed) == (1, 1)
+    assert registry.active() == ["1"]
+    # Engellenen sohbet yeniden denenmez ve diskte de pasiftir
+    assert len([r for r in stub.hits(SEND) if r.form["chat_id"] == "2"]) == 1
+    assert SubscriberRegistry(path=registry.path).active() == ["1"]
+
+
+def test_identical_broadcast_is_deduplicated(stub, registry):
+    stub.route(SEND, lambda request: (200, {"ok": True}))
+    fanout = engine(stub, registry)
+
+    job = fanout.broadcast("aynı mesaj")
+    wait_done(job)
+
+    assert fanout.broadcast("aynı mesaj") is None
+    assert fanout.duplicates == 1
+    assert len(stub.hits(SEND)) == 2
+    # Belirli sohbetlere giden aynı metin ayrı anahtarla tutulur
+    assert fanout.broadcast("aynı mesaj", chat_ids=["1"]) is not None
+
+
+def test_command_replies_skip_dedup(stub, registry):
+    stub.route(SEND, lambda request: (200, {"ok": True}))
+    fanout = engine(stub, registry)
+
+    for _ in range(2):
+        wait_done(fanout.broadcast("📋 Alarmınız yok", chat_ids=["1"], dedup=False))
+
+    assert len(stub.hits(SEND)) == 2
+    assert fanout.duplicates == 0
+
+
+def test_worker_survives_handler_errors(stub, registry, monkeypatch):
+    stub.route(SEND, sequence((403, {"ok": False}), (200, {"ok": True})))
+
+    def broken(chat_id):
+        raise OSError("disk dolu")
+    monkeypatch.setattr(registry, "deactivate", broken)
+    fanout = engine(stub, registry, workers=1)
+
+    first = fanout.broadcast("bir", chat_ids=["1"])
+    wait_done(first)
+    second = fanout.broadcast("iki", chat_ids=["1"])
+    wait_done(second)
+
+    assert (first.failed, second.sent) == (1, 1)
+
+
+def test_non_dict_error_body_does_not_kill_worker(stub, registry):
+    stub.route(SEND, sequence((429, ["beklenmedik"]), (200, {"ok": True})))
+    fanout = engine(stub, registry, workers=1)
+
+    job = fanout.broadcast("liste", chat_ids=["1"])
+    wait_done(job)
+
+    assert job.sent == 1
+
+
+def test_poll_subscribers_handles_start_stop_and_commands(stub, registry):
+    updates = [
+        {"update_id": 10, "message": {"chat": {"id": 3}, "text": "/start"}},
+        {"update_id": 11, "message": {"chat": {"id": 1}, "text": "/stop"}},
+        {"update_id": 12, "message": {"chat": {"id": 2}, "text": "/alerts"}},
+        {"update_id": 13, "message": {"text": "kimsiz"}},
+    ]
+    stub.route("/botTOKEN/getUpdates", lambda request: (200, {"ok": True, "result": updates}))
+    commands = []
+
+    offset = poll_subscribers(HttpClient(retries=0), stub.url, "TOKEN", registry, 5,
+                              on_command=lambda chat_id, text: commands.append((chat_id, text)))
+
+    assert offset == 14
+    assert stub.hits("/botTOKEN/getUpdates")[0].query["offset"] == "5"
+    assert sorted(registry.active()) == ["2", "3"]
+    assert commands == [(2, "/alerts")]
+
+
+def test_failing_command_does_not_abort_batch(stub, registry):
+    updates = [
+        {"update_id": 20, "message": {"chat": {"id": 1}, "text": "/alert bozuk"}},
+        {"update_id": 21, "message": {"chat": {"id": 2}, "text": "/alerts"}},
+        {"update_id": 22, "message": {"chat": {"id": 4}, "text": "/start"}},
+    ]
+    stub.route("/botTOKEN/getUpdates", lambda request: (200, {"ok": True, "result": updates}))
+    commands = []
+
+    def on_command(chat_id, text):
+        if chat_id == 1:
+            raise RuntimeError("işleyici çöktü")
+        commands.append(text)
+
+    offset = poll_subscribers(HttpClient(retries=0), stub.url, "TOKEN", registry, 20, on_command=on_command)
+
+    assert offset == 23
+    assert commands == ["/alerts"]
+    assert "4" in registry.active()
+
+
+def test_stale_registry_does_not_drop_new_subscribers(registry):
+    # Eski liderin eklediği abone, yeni liderin bellekteki eski kopyasıyla ezilmez
+    SubscriberRegistry(path=registry.path).add("3")
+    registry.add("4")
+    registry.deactivate("1")
+    assert sorted(SubscriberRegistry(path=registry.path).active()) == ["2", "3", "4"]
+
+
+def test_offset_is_shared_between_leaders(stub, registry, tmp_path):
+    updates = [{"update_id": 7, "message": {"chat": {"id": 5}, "text": "/start"}}]
+    stub.route("/botTOKEN/getUpdates", lambda request: (200, {"ok": True, "result": [
+        update for update in updates if update["update_id"] >= int(request.query["offset"])]}))
+    path = str(tmp_path / "offset.json")
+    assert load_offset(path) == 0
+
+    save_offset(poll_subscribers(HttpClient(retries=0), stub.url, "TOKEN", registry, load_offset(path)), path)
+
+    assert load_offset(path) == 8
+    commands = []
+    poll_subscribers(HttpClient(retries=0), stub.url, "TOKEN", registry, load_offset(path),
+                     on_command=lambda chat_id, text: commands.append(text))
+    assert commands == [] and stub.hits("/botTOKEN/getUpdates")[-1].query["offset"] == "8"
+
+
+def test_dedup_keys_expire_after_ttl(stub, registry):
+    stub.route(SEND, lambda request: (200, {"ok": True}))
+    fanout = engine(stub, registry, dedup_ttl=0.2)
+
+    assert fanout.broadcast("a", chat_ids=["1"]) is not None
+    assert fanout.broadcast("a", chat_ids=["1"]) is None
+    time.sleep(0.25)
+    assert fanout.broadcast("b", chat_ids=["1"]) is not None
+    assert fanout.broadcast("a", chat_ids=["1"]) is not None
+    assert len(fanout._recent) == 2
@@ -0,0 +1,361 @@
+import os
+import json
+import struct
+import threading
+import logging
+import numpy as np
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+# Her kayıt sabit genişlikte: int64 epoch saniye + float64 fiyat (16 byte)
+TICK_DTYPE = np.dtype([("ts", "<i8"), ("price", "<f8")])
+RECORD = struct.Struct("<qd")
+RECORD_SIZE = RECORD.size
+SEGMENT_RECORDS = 65536
+SEGMENT_PREFIX = "seg-"
+SEGMENT_SUFFIX = ".bin"
+MERGE_JOURNAL = "merge.journal"
+
+
+def segment_name(index):
+    return f"{SEGMENT_PREFIX}{index:06d}{SEGMENT_SUFFIX}"
+
+
+class TickStore:
+    # readonly=True: başka bir sürecin (lider) yazdığı depoyu izler; onarım yapmaz,
+    # yazma tanıtıcısı açmaz. refresh() ile diskteki yeni durumu okur.
+    def __init__(self, root, segment_records=SEGMENT_RECORDS, fsync=False, readonly=False):
+        self.root = root
+        self.segment_records = segment_records
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._maps = {}
+        self._fd = None
+        if readonly:
+            self._scan()
+        else:
+            self._open_writer()
+
+    @property
+    def readonly(self):
+        return self._fd is None
+
+    def _scan(self):
+        # Salt okunur kopya dizini oluşturmaz; lider henüz yazmadıysa depo boş görünür
+        names = os.listdir(self.root) if os.path.isdir(self.root) else []
+        self._segments = sorted(
+            name for name in names
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)
+        )
+        if not self._segments:
+            self._segments.append(segment_name(0))
+        self._inodes = {name: self._inode(name) for name in self._segments}
+        self._sealed_count = sum(
+            os.path.getsize(self._path(name)) // RECORD_SIZE for name in self._segments[:-1]
+        )
+        path = self._path(self._segments[-1])
+        self._active_count = os.path.getsize(path) // RECORD_SIZE if os.path.exists(path) else 0
+        self.last = self._read_last()
+
+    def _open_writer(self):
+        os.makedirs(self.root, exist_ok=True)
+        self._recover()
+        self._scan()
+        self._active_count = self._repair(self._segments[-1])
+        self._fd = self._open(self._segments[-1])
+        self._inodes[self._segments[-1]] = self._inode(self._segments[-1])
+
+    def open_writer(self):
+        # İzleyici lider olduğunda: yarım kalan birleştirme/kayıt onarılır, yazma açılır
+        with self._lock:
+            if self._fd is None:
+                self._maps.clear()
+                self._open_writer()
+
+    def close_writer(self):
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+    def refresh(self):
+        # Salt okunur kopya için: segment listesi ve sayaçlar diskten yeniden okunur.
+        # Geçmişe ekleme segmentleri yeni dosyayla değiştirdiğinden inode değişir.
+        # Dönüş: "rewrite", "append" ya da değişiklik yoksa None.
+        with self._lock:
+            if os.path.exists(self._path(MERGE_JOURNAL)):
+                return None
+            before = len(self)
+            inodes = self._inodes
+            self._scan()
+            rewritten = [name for name, inode in inodes.items() if self._inodes.get(name) != inode]
+            for name in rewritten:
+                self._maps.pop(name, None)
+            if rewritten:
+                return "rewrite"
+            return "append" if len(self) != before else None
+
+    def _inode(self, name):
+        try:
+            return os.stat(self._path(name)).st_ino
+        except FileNotFoundError:
+            return None
+
+    def _path(self, name):
+        return os.path.join(self.root, name)
+
+    def _open(self, name):
+        return os.open(self._path(name), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+
+    def _recover(self):
+        # Yarıda kalan birleştirme: günlük yazılmışsa tüm geçici segmentler hazırdır,
+        # yeniden adlandırma tamamlanır; günlük yoksa geçici dosyalar atılır.
+        journal = self._path(MERGE_JOURNAL)
+        if os.path.exists(journal):
+            with open(journal) as f:
+                names = json.load(f)
+            for name in names:
+                tmp = self._path(f"{name}.tmp")
+                if os.path.exists(tmp):
+                    os.replace(tmp, self._path(name))
+            os.remove(journal)
+            logging.warning(f"⚠️ {self.root} yarım kalan birleştirme tamamlandı")
+        for name in os.listdir(self.root):
+            if name.endswith(".tmp") or name == f"{MERGE_JOURNAL}.new":
+                os.remove(self._path(name))
+
+    def _repair(self, name):
+        # Yazım sırasında çökme olduysa yarım kalan son kaydı at
+        path = self._path(name)
+        if not os.path.exists(path):
+            return 0
+        size = os.path.getsize(path)
+        if size % RECORD_SIZE:
+            logging.warning(f"⚠️ {path} sonunda yarım kayıt bulundu, kırpılıyor")
+            with open(path, "r+b") as f:
+                f.truncate(size - size % RECORD_SIZE)
+        return size // RECORD_SIZE
+
+    def _read_last(self):
+        for name in reversed(self._segments):
+            path = self._path(name)
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            # Yazar kayıt ortasındaysa yarım kayıt okunmaz
+            size -= size % RECORD_SIZE
+            if size >= RECORD_SIZE:
+                with open(path, "rb") as f:
+                    f.seek(size - RECORD_SIZE)
+                    return RECORD.unpack(f.read(RECORD_SIZE))
+        return None
+
+    def _rotate(self):
+        os.close(self._fd)
+        self._sealed_count += self._active_count
+        self._segments.append(segment_name(len(self._segments)))
+        self._active_count = 0
+        self._fd = self._open(self._segments[-1])
+        self._inodes[self._segments[-1]] = self._inode(self._segments[-1])
+        logging.info(f"🗂️ Yeni segment açıldı: {self._segments[-1]}")
+
+    def _write(self, data):
+        if self._fd is None:
+            raise PermissionError(f"{self.root} salt okunur açıldı")
+        os.write(self._fd, data)
+        if self.fsync:
+            os.fsync(self._fd)
+
+    def __len__(self):
+        return self._sealed_count + self._active_count
+
+    def append(self, ts, price):
+        # Depo zaman sırasında kalmalı (range/searchsorted buna dayanır); son kayıttan
+        # eski ya da aynı damgalı satır reddedilir, geçmişe insert_many ile eklenir
+        with self._lock:
+            if self.last is not None and int(ts) <= self.last[0]:
+                raise ValueError(f"{self.root}: {int(ts)} son kayıttan ({self.last[0]}) yeni değil")
+            if self._active_count >= self.segment_records:
+                self._rotate()
+            self._write(RECORD.pack(int(ts), float(price)))
+            self._active_count += 1
+            self.last = (int(ts), float(price))
+
+    def append_many(self, ts, prices):
+        records = np.empty(len(ts), dtype=TICK_DTYPE)
+        records["ts"] = ts
+        records["price"] = prices
+        if not len(records):
+            return
+        with self._lock:
+            self._append_records(records)
+
+    def _append_records(self, records):
+        pos = 0
+        while pos < len(records):
+            if self._active_count >= self.segment_records:
+                self._rotate()
+            room = self.segment_records - self._active_count
+            chunk = records[pos:pos + room]
+            self._write(chunk.tobytes())
+            self._active_count += len(chunk)
+            pos += len(chunk)
+        self.last = (int(records["ts"][-1]), float(records["price"][-1]))
+
+    def insert_many(self, ts, prices):
+        # Sırasız/geçmişe toplu ekleme: son kayıttan yeni satırlar sona eklenir,
+        # eskiler etkilenen ilk segmentten itibaren birleştirilip yeniden yazılır.
+        # Var olan zaman damgalarıyla çakışan satırlar atlanır. Eklenen satır sayısını döndürür.
+        records = np.empty(len(ts), dtype=TICK_DTYPE)
+        records["ts"] = ts
+        records["price"] = prices
+        records = records[np.argsort(records["ts"], kind="stable")]
+        if not len(records):
+            return 0
+        with self._lock:
+            if self._fd is None:
+                raise PermissionError(f"{self.root} salt okunur açıldı")
+            if self.last is None or records["ts"][0] > self.last[0]:
+                self._append_records(records)
+                return len(records)
+            counts = [os.path.getsize(self._path(name)) // RECORD_SIZE for name in self._segments[:-1]]
+            counts.append(self._active_count)
+            maps = [self._segment_map(name, count) for name, count in zip(self._segments, counts)]
+            firsts = np.array([seg["ts"][0] if len(seg) else np.iinfo(np.int64).max for seg in maps])
+            first = max(int(np.searchsorted(firsts, records["ts"][0], side="right")) - 1, 0)
+            existing = np.concatenate(maps[first:])
+            records = records[~np.isin(records["ts"], existing["ts"])]
+            if not len(records):
+                return 0
+            merged = np.concatenate((existing, records))
+            merged = merged[np.argsort(merged["ts"], kind="stable")]
+            self._rewrite(first, merged)
+            self._sealed_count = sum(counts[:first]) + (len(self._segments) - 1 - first) * self.segment_records
+            self._active_count = len(merged) - (len(self._segments) - 1 - first) * self.segment_records
+            self.last = (int(merged["ts"][-1]), float(merged["price"][-1]))
+            return len(records)
+
+    def _rewrite(self, first, records):
+        # Önce tüm yeni segmentler geçici dosyalara yazılıp diske indirilir, sonra
+        # günlük yazılır ve yeniden adlandırılır; çökme anında _recover tamamlar.
+        os.close(self._fd)
+        names = []
+        for k, pos in enumerate(range(0, len(records), self.segment_records)):
+            name = segment_name(first + k)
+            with open(self._path(f"{name}.tmp"), "wb") as f:
+                f.write(records[pos:pos + self.segment_records].tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            names.append(name)
+        journal = self._path(MERGE_JOURNAL)
+        with open(f"{journal}.new", "w") as f:
+            json.dump(names, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(f"{journal}.new", journal)
+        for name in names:
+            os.replace(self._path(f"{name}.tmp"), self._path(name))
+            self._maps.pop(name, None)
+        os.remove(journal)
+        self._segments = self._segments[:first] + names
+        self._inodes.update((name, self._inode(name)) for name in names)
+        self._fd = self._open(self._segments[-1])
+
+    def _segment_map(self, name, count):
+        if count == 0:
+            return np.empty(0, dtype=TICK_DTYPE)
+        cached = self._maps.get(name)
+        if cached is None or len(cached) != count:
+            cached = np.memmap(self._path(name), dtype=TICK_DTYPE, mode="r", shape=(count,))
+            self._maps[name] = cached
+        return cached
+
+    def segments(self):
+        with self._lock:
+            names = list(self._segments)
+            active_count = self._active_count
+        maps = []
+        for name in names[:-1]:
+            maps.append(self._segment_map(name, os.path.getsize(self._path(name)) // RECORD_SIZE))
+        maps.append(self._segment_map(names[-1], active_count))
+        return maps
+
+    def read(self, start=0, stop=None):
+        total = len(self)
+        stop = total if stop is None else min(stop, total)
+        if start < 0:
+            start = max(total + start, 0)
+        parts = []
+        offset = 0
+        for seg in self.segments():
+            end = offset + len(seg)
+            if end > start and offset < stop:
+                parts.append(seg[max(start - offset, 0):min(stop, end) - offset])
+            offset = end
+        records = np.concatenate(parts) if parts else np.empty(0, dtype=TICK_DTYPE)
+        return records["ts"], records["price"]
+
+    def range(self, start=None, end=None):
+        # Zaman aralığı sorgusu: zaman damgaları artan sırada yazıldığı için önce
+        # segment sınırlarında, sonra segment içinde ikili arama (O(log n + k))
+        segs = [seg for seg in self.segments() if len(seg)]
+        if not segs:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+        firsts = np.array([seg["ts"][0] for seg in segs])
+        lo = 0 if start is None else max(int(np.searchsorted(firsts, start, side="right")) - 1, 0)
+        hi = len(segs) if end is None else int(np.searchsorted(firsts, end, side="right"))
+        parts = []
+        for seg in segs[lo:hi]:
+            ts = seg["ts"]
+            i = 0 if start is None else int(np.searchsorted(ts, start))
+            j = len(ts) if end is None else int(np.searchsorted(ts, end, side="right"))
+            if i < j:
+                parts.append(seg[i:j])
+        records = np.concatenate(parts) if parts else np.empty(0, dtype=TICK_DTYPE)
+        return records["ts"], records["price"]
+
+    def close(self):
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+            self._maps.clear()
+
+
+def system_zone():
+    # Sabit ofset değil gerçek saat dilimi: yaz/kış saati geçişleri satır bazında uygulanır
+    name = os.getenv("TZ", "").lstrip(":")
+    try:
+        if name:
+            return ZoneInfo(name)
+        with open("/etc/localtime", "rb") as f:
+            return ZoneInfo.from_file(f)
+    except (OSError, ValueError) as e:
+        logging.warning(f"⚠️ Sistem saat dilimi okunamadı ({e}), geçerli ofset kullanılıyor")
+        return datetime.now().astimezone().tzinfo
+
+
+def import_csv(store, path, tz=None):
+    import pandas as pd
+
+    df = pd.read_csv(path)
+    if df.empty:
+        return 0
+    # Eski data.csv yerel saatle yazılıyordu; epoch saniyeye çevir
+    tz = ZoneInfo(tz) if isinstance(tz, str) else tz or system_zone()
+    local = pd.to_datetime(df["timestamp"])
+    try:
+        # Dosya yazım sırasında: geri alınan saatteki tekrarlar sıradan çıkarılır
+        stamps = local.dt.tz_localize(tz, ambiguous="infer", nonexistent="shift_forward")
+    except ValueError:
+        stamps = local.dt.tz_localize(tz, ambiguous="NaT", nonexistent="shift_forward")
+    valid = stamps.notna().to_numpy()
+    if not valid.all():
+        logging.warning(f"⚠️ {path}: belirsiz yerel saatli {int((~valid).sum())} kayıt atlandı")
+        df, stamps = df[valid], stamps[valid]
+    ts = ((stamps - pd.Timestamp(0, tz="UTC")) // pd.Timedelta(seconds=1)).to_numpy(dtype=np.int64)
+    prices = df["price"].to_numpy(dtype=np.float64)
+    # İleri kaydırılan (var olmayan) saatler aynı damgaya düşebilir; ilki tutulur
+    ts, first = np.unique(ts, return_index=True)
+    store.append_many(ts, prices[first])
+    os.replace(path, path + ".imported")
+    logging.info(f"📥 {path} içinden {len(ts)} kayıt içe aktarıldı")
+    return len(ts)